@@ -0,0 +1,9 @@
+-- Migration: Add Covering Index for User Listing
+-- Version: 018
+-- Date: 2026-10-18
+-- Description: Covering index for keyset-paginated /api/users/list (created_at DESC, id DESC)
+-- Note: CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS users_listing_idx
+ON users (created_at DESC, id DESC)
+INCLUDE (username, email, full_name, current_balance, is_active, trading_enabled, updated_at);
@@ -60,6 +60,17 @@ async def lifespan(app: FastAPI):
     try:
         logger.info("🚀 Starting ShareKhan Trading System...")
         
+        # Bound the threadpool used for sync endpoints and run_in_threadpool calls
+        from src.utils.async_utils import configure_threadpool
+        configure_threadpool()
+        
+        # Seed the master broker account once per process (previously done at import time)
+        try:
+            from src.api.trading_control import ensure_default_users
+            ensure_default_users()
+        except Exception as e:
+            logger.warning(f"⚠️ Default broker users not initialized: {e}")
+        
         # Validate environment variables
         required_env_vars = [
             'SHAREKHAN_API_KEY',
@@ -144,6 +155,13 @@ async def lifespan(app: FastAPI):
                 logger.info("✅ Orchestrator cleanup completed")
             except Exception as e:
                 logger.error(f"❌ Cleanup error: {e}")
+        
+        # Return pooled async database connections
+        try:
+            from src.core.database import db_manager
+            await db_manager.close_async()
+        except Exception as e:
+            logger.error(f"❌ Database pool cleanup error: {e}")
 
 # Create FastAPI application
 app = FastAPI(
@@ -263,7 +281,7 @@ except Exception as e:
 # Token Management API (FIXED for frontend compatibility)
 try:
     from src.api.token_management_api import router as token_mgmt_router
-    app.include_router(token_mgmt_router, tags=["token-management"])
+    app.include_router(token_mgmt_router)
     logger.info("✅ Token Management API loaded")
 except Exception as e:
     logger.warning(f"⚠️ Token Management API not loaded: {e}")
@@ -350,6 +368,16 @@ try:
 except Exception as e:
     logger.warning(f"⚠️ Autonomous Trading API not loaded: {e}")
 
+# Trading Control API (broker users, trading start/stop, manual ShareKhan auth)
+try:
+    from src.api.trading_control import router as trading_control_router, StatusASGI
+    app.include_router(trading_control_router, prefix="/api", tags=["trading"])
+    # Pure-ASGI fast path for status polling (/trading/status, /sharekhan-manual/status)
+    app.mount("/api/v1/control/fast", StatusASGI())
+    logger.info("✅ Trading Control API loaded")
+except Exception as e:
+    logger.warning(f"⚠️ Trading Control API not loaded: {e}")
+
 # Simple User Management API (NEW - for dynamic user creation without storing credentials)
 try:
     from src.api.simple_user_management import router as simple_user_router
@@ -61,6 +61,17 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting ShareKhan Trading System...")
     
     try:
+        # Bound the threadpool used for sync endpoints and run_in_threadpool calls
+        from src.utils.async_utils import configure_threadpool
+        configure_threadpool()
+        
+        # Seed the master broker account once per process (previously done at import time)
+        try:
+            from src.api.trading_control import ensure_default_users
+            ensure_default_users()
+        except Exception as e:
+            logger.warning(f"Default broker users not initialized: {e}")
+        
         # Try to initialize ShareKhan orchestrator with fallback
         try:
             from src.core.sharekhan_orchestrator import ShareKhanTradingOrchestrator
@@ -209,8 +220,10 @@ except Exception as e:
 
 # Trading Control & Strategies
 try:
-    from src.api.trading_control import router as trading_control_router
+    from src.api.trading_control import router as trading_control_router, StatusASGI
     app.include_router(trading_control_router, prefix="/api", tags=["trading"])
+    # Pure-ASGI fast path for status polling (/trading/status, /sharekhan-manual/status)
+    app.mount("/api/v1/control/fast", StatusASGI())
     routes_loaded.append("trading-control")
 except Exception as e:
     logger.warning(f"Trading control routes not loaded: {e}")
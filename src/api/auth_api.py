@@ -6,10 +6,13 @@ Provides login, logout, and token management
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import jwt
 import logging
+import time
+
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +24,9 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 router = APIRouter(prefix="/auth", tags=["authentication"])
 security = HTTPBearer()
 
+# Decoded payloads keyed by raw bearer token; each entry is honoured only until the token's own exp
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
 # Pydantic Models
 class LoginRequest(BaseModel):
     email: EmailStr
@@ -74,14 +80,20 @@ def create_access_token(data: Dict[str, Any]) -> str:
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """Verify JWT token"""
+    bearer = credentials.credentials
+    cached: Optional[Tuple[Dict[str, Any], float]] = _token_cache.get(bearer)
+    if cached is not None and cached[1] > time.time():
+        return cached[0]
+    
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(bearer, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials"
             )
+        _token_cache[bearer] = (payload, float(payload.get("exp", 0)))
         return payload
     except jwt.PyJWTError:
         raise HTTPException(
@@ -91,15 +103,10 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security))
 
 async def get_current_user(token_data: Dict[str, Any] = Depends(verify_token)) -> Dict[str, Any]:
     """Get current authenticated user"""
-    user_id = token_data.get("sub")
     email = token_data.get("email")
     
-    # Find user in mock database
-    user = None
-    for user_email, user_data in MOCK_USERS.items():
-        if user_data["email"] == email:
-            user = user_data
-            break
+    # Find user in mock database (keyed by email)
+    user = MOCK_USERS.get(email)
     
     if user is None:
         raise HTTPException(
@@ -5,11 +5,12 @@ Real-time debugging and fixing capabilities
 """
 
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import logging
 import asyncio
+import os
 import traceback
 
 from src.core.dependencies import get_orchestrator
@@ -21,10 +22,23 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Timeouts (seconds) for external ShareKhan calls
+_QUOTE_TIMEOUT = 2.0
+_POSITIONS_TIMEOUT = 5.0
+_SYNC_TIMEOUT = 15.0
+
+# In-flight position syncs keyed by (user_id, sharekhan_client_id) so that
+# concurrent force-sync requests share a single broker call
+_SYNC_INFLIGHT: Dict[Tuple[int, str], asyncio.Task] = {}
+_SYNC_LOCK = asyncio.Lock()
+
+# Default symbols for live data tests (immutable, shared across requests)
+_DEFAULT_SYMBOLS: Tuple[str, ...] = ("RELIANCE", "TCS", "INFY", "HDFC", "ICICIBANK")
+
 class DataTestRequest(BaseModel):
     user_id: int
     sharekhan_client_id: str
-    test_symbols: Optional[List[str]] = ["RELIANCE", "TCS", "INFY", "HDFC", "ICICIBANK"]
+    test_symbols: Optional[List[str]] = Field(default_factory=lambda: list(_DEFAULT_SYMBOLS))
 
 class DataFixRequest(BaseModel):
     user_id: int
@@ -80,9 +94,13 @@ async def check_connection_status(
             # Test data connectivity
             if integration.is_authenticated:
                 try:
-                    test_quotes = await integration.get_market_quote(["RELIANCE"])
+                    test_quotes = await asyncio.wait_for(
+                        integration.get_market_quote(["RELIANCE"]), timeout=_QUOTE_TIMEOUT
+                    )
                     diagnostics["data_connectivity"]["can_fetch_quotes"] = len(test_quotes) > 0
                     diagnostics["data_connectivity"]["last_data_update"] = datetime.now().isoformat()
+                except asyncio.TimeoutError:
+                    diagnostics["data_connectivity"]["fetch_error"] = f"Quote fetch timed out after {_QUOTE_TIMEOUT}s"
                 except Exception as e:
                     diagnostics["data_connectivity"]["fetch_error"] = str(e)
         
@@ -128,6 +146,9 @@ async def test_live_data_fetch(request: DataTestRequest):
                 "auth_endpoint": "/api/sharekhan-auth/auth/submit-daily-token"
             }
         
+        # Treat symbols as read-only; fall back to the shared tuple when empty
+        test_symbols = request.test_symbols or _DEFAULT_SYMBOLS
+        
         test_results = {
             "user_id": request.user_id,
             "sharekhan_client_id": request.sharekhan_client_id,
@@ -139,13 +160,13 @@ async def test_live_data_fetch(request: DataTestRequest):
             },
             "symbol_tests": [],
             "overall_success": False,
-            "total_symbols_tested": len(request.test_symbols),
+            "total_symbols_tested": len(test_symbols),
             "successful_fetches": 0,
             "failed_fetches": 0
         }
         
         # Test each symbol individually
-        for symbol in request.test_symbols:
+        for symbol in test_symbols:
             symbol_test = {
                 "symbol": symbol,
                 "success": False,
@@ -156,7 +177,9 @@ async def test_live_data_fetch(request: DataTestRequest):
             
             try:
                 start_time = datetime.now()
-                quotes = await sharekhan_client.get_market_quote([symbol])
+                quotes = await asyncio.wait_for(
+                    sharekhan_client.get_market_quote([symbol]), timeout=_QUOTE_TIMEOUT
+                )
                 end_time = datetime.now()
                 
                 if symbol in quotes:
@@ -172,6 +195,10 @@ async def test_live_data_fetch(request: DataTestRequest):
                     symbol_test["error"] = "Symbol not found in response"
                     test_results["failed_fetches"] += 1
                     
+            except asyncio.TimeoutError:
+                symbol_test["error"] = f"Quote fetch timed out after {_QUOTE_TIMEOUT}s"
+                symbol_test["error_type"] = "TimeoutError"
+                test_results["failed_fetches"] += 1
             except Exception as e:
                 symbol_test["error"] = str(e)
                 symbol_test["error_type"] = type(e).__name__
@@ -265,7 +292,9 @@ async def fix_data_connectivity(
         fix_results["steps_attempted"].append("Testing data connectivity")
         try:
             test_symbols = ["RELIANCE", "TCS"]
-            quotes = await sharekhan_client.get_market_quote(test_symbols)
+            quotes = await asyncio.wait_for(
+                sharekhan_client.get_market_quote(test_symbols), timeout=_QUOTE_TIMEOUT
+            )
             
             if len(quotes) > 0:
                 fix_results["data_test_success"] = True
@@ -275,6 +304,9 @@ async def fix_data_connectivity(
                 fix_results["final_status"] = "DATA_UNAVAILABLE"
                 fix_results["steps_attempted"].append("❌ Data test failed: No quotes returned")
                 
+        except asyncio.TimeoutError:
+            fix_results["final_status"] = "DATA_TIMEOUT"
+            fix_results["steps_attempted"].append(f"❌ Data test timed out after {_QUOTE_TIMEOUT}s")
         except Exception as e:
             fix_results["final_status"] = "DATA_ERROR"
             fix_results["steps_attempted"].append(f"❌ Data test failed: {e}")
@@ -346,12 +378,17 @@ async def check_live_positions_status(
             
             try:
                 # Test position fetching
-                positions_result = await sharekhan_client.get_positions()
+                positions_result = await asyncio.wait_for(
+                    sharekhan_client.get_positions(), timeout=_POSITIONS_TIMEOUT
+                )
                 status["sharekhan_connectivity"]["can_fetch_positions"] = positions_result.get("success", False)
                 
                 if not positions_result.get("success"):
                     status["sharekhan_connectivity"]["last_error"] = positions_result.get("error", "Unknown error")
                     
+            except asyncio.TimeoutError:
+                status["sharekhan_connectivity"]["can_fetch_positions"] = False
+                status["sharekhan_connectivity"]["last_error"] = f"Position fetch timed out after {_POSITIONS_TIMEOUT}s"
             except Exception as e:
                 status["sharekhan_connectivity"]["can_fetch_positions"] = False
                 status["sharekhan_connectivity"]["last_error"] = str(e)
@@ -393,13 +430,35 @@ async def force_sync_positions(
         if not api_key or not api_secret:
             raise HTTPException(status_code=400, detail="ShareKhan credentials not configured")
         
-        # Force sync positions
-        sync_result = await orchestrator.enhanced_position_manager.sync_positions_from_sharekhan(
-            user_id=user_id,
-            sharekhan_client_id=sharekhan_client_id,
-            sharekhan_api_key=api_key,
-            sharekhan_api_secret=api_secret
-        )
+        # Force sync positions (coalesced with any in-flight sync for this user)
+        key = (user_id, sharekhan_client_id)
+        async with _SYNC_LOCK:
+            sync_task = _SYNC_INFLIGHT.get(key)
+            if sync_task is None:
+                sync_task = asyncio.create_task(
+                    orchestrator.enhanced_position_manager.sync_positions_from_sharekhan(
+                        user_id=user_id,
+                        sharekhan_client_id=sharekhan_client_id,
+                        sharekhan_api_key=api_key,
+                        sharekhan_api_secret=api_secret
+                    )
+                )
+                _SYNC_INFLIGHT[key] = sync_task
+                sync_task.add_done_callback(lambda _: _SYNC_INFLIGHT.pop(key, None))
+            else:
+                logger.info(f"🔄 Joining in-flight position sync for user {user_id}")
+        
+        try:
+            # Shield so one caller timing out does not cancel the shared sync
+            sync_result = await asyncio.wait_for(asyncio.shield(sync_task), timeout=_SYNC_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Position sync timed out for user {user_id}")
+            return {
+                "success": False,
+                "error": f"Position sync timed out after {_SYNC_TIMEOUT}s",
+                "error_type": "TimeoutError",
+                "message": "Position sync timed out"
+            }
         
         return {
             "success": sync_result.get("success", False),
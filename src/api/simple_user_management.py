@@ -4,15 +4,105 @@ Creates basic user records without storing credentials
 100% REAL DATA from ShareKhan API
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+import asyncio
+import base64
 import logging
+import orjson
 from datetime import datetime
+from types import MappingProxyType
+from cachetools import TTLCache
+from sqlalchemy import text
+
+from src.core.database import db_manager
+from src.core.real_position_manager import get_position_manager
+from src.core.redis_connection_manager import get_request_redis_client, report_redis_error
+from src.core.sharekhan_client_cache import (
+    ShareKhanAuthError, get_authenticated_client, invalidate_client
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/users", tags=["simple-user-management"])
 
+# Rows pulled per server-side cursor fetch when listing users
+_LIST_FETCH_SIZE = 1000
+
+# Read-only response envelopes merged with per-request fields via `|`
+_RESP_OK = MappingProxyType({"success": True})
+_RESP_OK_DB = MappingProxyType({"success": True, "source": "database"})
+_RESP_OK_LIVE = MappingProxyType({"success": True, "source": "sharekhan_live"})
+
+# Caps concurrent ShareKhan calls across all requests to avoid rate-limit storms
+_SK_SEM = asyncio.Semaphore(32)
+
+# Order states counted as pending in the trading summary
+_PENDING_STATES = frozenset({'PENDING', 'OPEN'})
+
+# Per-user detail cache; every users mutation lives in this module and invalidates it
+_user_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+
+# Serialized /list pages at users:list:v1:{version}:{limit}:{after}. Every users write INCRs
+# the version, so a page rendered from older rows is never read again and simply expires.
+_USERS_LIST_VERSION_KEY = "users:list:version"
+_USERS_LIST_PAGE_KEY = "users:list:v1:{}:{}:{}"
+_USERS_LIST_CACHE_TTL = 300
+
+# SQL statements, built once at import and reused by every request
+_INSERT_USER = text("""
+    INSERT INTO users (
+        username, email, full_name, 
+        initial_capital, current_balance, risk_tolerance,
+        is_active, trading_enabled, 
+        max_daily_trades, max_position_size, 
+        created_at, updated_at
+    ) VALUES (
+        :username, :email, :full_name, :initial_capital, :current_balance,
+        :risk_tolerance, :is_active, :trading_enabled, :max_daily_trades,
+        :max_position_size, now(), now()
+    ) RETURNING id AS user_id, username, full_name, email, initial_capital,
+               current_balance, is_active, trading_enabled, created_at, updated_at
+""")
+
+# Keyset pagination over (created_at DESC, id DESC), served by users_listing_idx
+_SELECT_USERS_FIRST_PAGE = text("""
+    SELECT id AS user_id, username, email, full_name, current_balance,
+           is_active, trading_enabled, created_at, updated_at AS last_updated
+    FROM users 
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit
+""")
+
+_SELECT_USERS_AFTER = text("""
+    SELECT id AS user_id, username, email, full_name, current_balance,
+           is_active, trading_enabled, created_at, updated_at AS last_updated
+    FROM users 
+    WHERE (created_at, id) < (:after_created, :after_id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit
+""")
+
+_SELECT_USER = text("""
+    SELECT id AS user_id, username, email, full_name, initial_capital, 
+           current_balance, risk_tolerance, is_active, trading_enabled,
+           max_daily_trades, max_position_size, created_at, updated_at AS last_updated
+    FROM users WHERE id = :user_id
+""")
+
+_UPDATE_BALANCE_RETURNING = text("""
+    UPDATE users 
+    SET current_balance = COALESCE(CAST(:current_balance AS NUMERIC), current_balance),
+        updated_at = CASE WHEN CAST(:current_balance AS NUMERIC) IS NULL THEN updated_at ELSE now() END
+    WHERE id = :user_id
+    RETURNING username, full_name
+""")
+
+_SELECT_USERNAME = text("SELECT username FROM users WHERE id = :user_id")
+
+_DELETE_USER = text("DELETE FROM users WHERE id = :user_id")
+
 class SimpleUserCreate(BaseModel):
     """Simple user creation model - NO CREDENTIALS STORED"""
     username: str
@@ -38,7 +128,7 @@ class UserResponse(BaseModel):
     created_at: str
     message: str
 
-@router.post("/create", response_model=UserResponse)
+@router.post("/create", response_class=ORJSONResponse, responses={200: {"model": UserResponse}})
 async def create_simple_user(user_data: SimpleUserCreate):
     """
     Create a simple user record in database (no credentials stored)
@@ -47,154 +137,140 @@ async def create_simple_user(user_data: SimpleUserCreate):
     try:
         logger.info(f"🚀 Creating simple user: {user_data.username}")
         
-        # Create user in database
-        from src.core.database import db_manager
-        
-        session = db_manager.get_shared_session()
-        if not session:
-            raise HTTPException(status_code=503, detail="Database connection not available")
-        
         # Insert user without credentials
-        user_insert_query = """
-            INSERT INTO users (
-                username, email, full_name, 
-                initial_capital, current_balance, risk_tolerance,
-                is_active, trading_enabled, 
-                max_daily_trades, max_position_size, 
-                created_at, updated_at
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            ) RETURNING id, username, email, full_name, initial_capital, 
-                       current_balance, is_active, trading_enabled, created_at
-        """
-        
-        user_data_tuple = (
-            user_data.username,
-            user_data.email,
-            user_data.full_name,
-            user_data.initial_capital,
-            user_data.initial_capital,  # current_balance = initial_capital initially
-            user_data.risk_tolerance,
-            True,  # is_active
-            True,  # trading_enabled
-            user_data.max_daily_trades,
-            user_data.max_position_size,
-            datetime.now(),
-            datetime.now()
-        )
+        user_params = {
+            "username": user_data.username,
+            "email": user_data.email,
+            "full_name": user_data.full_name,
+            "initial_capital": user_data.initial_capital,
+            "current_balance": user_data.initial_capital,  # current_balance = initial_capital initially
+            "risk_tolerance": user_data.risk_tolerance,
+            "is_active": True,
+            "trading_enabled": True,
+            "max_daily_trades": user_data.max_daily_trades,
+            "max_position_size": user_data.max_position_size
+        }
         
-        result = session.execute(user_insert_query, user_data_tuple)
-        new_user = result.fetchone()
-        session.commit()
+        async with db_manager.async_session_scope() as session:
+            result = await session.execute(_INSERT_USER, user_params)
+            new_user = result.first()
         
         if not new_user:
             raise RuntimeError("Failed to create user in database")
+        await _invalidate_users_list_cache()
         
-        user_id = new_user[0]
-        logger.info(f"✅ Simple user created: {user_data.username} (ID: {user_id})")
-        
-        return UserResponse(
-            success=True,
-            user_id=user_id,
-            username=new_user[1],
-            full_name=new_user[3],
-            email=new_user[2],
-            initial_capital=float(new_user[4]),
-            current_balance=float(new_user[5]),
-            is_active=new_user[6],
-            trading_enabled=new_user[7],
-            created_at=new_user[8].isoformat(),
-            message=f"User {user_data.username} created successfully. Provide ShareKhan credentials when starting trading."
-        )
+        user = dict(new_user._mapping)
+        logger.info(f"✅ Simple user created: {user_data.username} (ID: {user['user_id']})")
+        
+        # Fields come straight from our own INSERT ... RETURNING, so skip re-validation;
+        # orjson formats the database timestamps directly
+        return ORJSONResponse(content=_RESP_OK | user | {
+            "message": f"User {user_data.username} created successfully. Provide ShareKhan credentials when starting trading."
+        })
         
     except Exception as e:
         logger.error(f"❌ User creation failed: {e}")
         raise HTTPException(status_code=500, detail=f"User creation failed: {str(e)}")
 
-@router.get("/list")
-async def list_all_users():
-    """Get list of all users"""
+def _encode_cursor(created_at: datetime, user_id: int) -> str:
+    """Encode the last row of a page as an opaque pagination cursor"""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{user_id}".encode()).decode()
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a pagination cursor into keyset bind parameters"""
+    created_at, user_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return {"after_created": datetime.fromisoformat(created_at), "after_id": int(user_id)}
+
+async def _invalidate_users_list_cache():
+    """Retire every cached /list page after a users table mutation"""
     try:
-        from src.core.database import db_manager
-        
-        session = db_manager.get_shared_session()
-        if not session:
-            raise HTTPException(status_code=503, detail="Database connection not available")
-        
-        users_query = """
-            SELECT id, username, email, full_name, current_balance, 
-                   is_active, trading_enabled, created_at, updated_at
-            FROM users 
-            ORDER BY created_at DESC
-        """
-        
-        result = session.execute(users_query)
-        users = result.fetchall()
+        redis_client = await get_request_redis_client("Users list cache")
+        if redis_client:
+            await redis_client.incr(_USERS_LIST_VERSION_KEY)
+    except Exception as e:
+        report_redis_error(e, "Users list cache invalidation")
+
+@router.get("/list", response_class=ORJSONResponse)
+async def list_all_users(
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = None
+):
+    """Get list of all users (keyset paginated; pass next_cursor as `after`)"""
+    try:
+        if after:
+            try:
+                params = _decode_cursor(after)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+            query = _SELECT_USERS_AFTER
+        else:
+            params = {}
+            query = _SELECT_USERS_FIRST_PAGE
+        params["limit"] = limit
+        
+        # Serve the pre-serialized page from Redis when available
+        page_key = None
+        redis_client = await get_request_redis_client("Users list cache")
+        try:
+            if redis_client:
+                version = await redis_client.get(_USERS_LIST_VERSION_KEY) or 0
+                page_key = _USERS_LIST_PAGE_KEY.format(version, limit, after or '')
+                cached = await redis_client.get(page_key)
+                if cached:
+                    return Response(content=cached, media_type="application/json")
+        except Exception as e:
+            report_redis_error(e, "Users list cache read")
         
         users_list = []
-        for user in users:
-            users_list.append({
-                "user_id": user[0],
-                "username": user[1],
-                "email": user[2],
-                "full_name": user[3],
-                "current_balance": float(user[4]),
-                "is_active": user[5],
-                "trading_enabled": user[6],
-                "created_at": user[7].isoformat(),
-                "last_updated": user[8].isoformat()
-            })
-        
-        return {
-            "success": True,
+        async with db_manager.get_async_session() as session:
+            # Server-side cursor keeps memory bounded for large pages
+            result = await session.stream(query, params)
+            async for users in result.partitions(_LIST_FETCH_SIZE):
+                users_list.extend([dict(user._mapping) for user in users])
+        
+        next_cursor = None
+        if len(users_list) == limit:
+            last = users_list[-1]
+            next_cursor = _encode_cursor(last["created_at"], last["user_id"])
+        
+        body = orjson.dumps(_RESP_OK_DB | {
             "data": users_list,
             "total_users": len(users_list),
-            "source": "database"
-        }
+            "limit": limit,
+            "next_cursor": next_cursor
+        })
         
+        if page_key:
+            try:
+                await redis_client.set(page_key, body, ex=_USERS_LIST_CACHE_TTL)
+            except Exception as e:
+                report_redis_error(e, "Users list cache write")
+        
+        return Response(content=body, media_type="application/json")
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Failed to list users: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/{user_id}")
+@router.get("/{user_id}", response_class=ORJSONResponse)
 async def get_user_details(user_id: int):
     """Get specific user details"""
     try:
-        from src.core.database import db_manager
-        
-        session = db_manager.get_shared_session()
-        user_query = """
-            SELECT id, username, email, full_name, initial_capital, 
-                   current_balance, risk_tolerance, is_active, trading_enabled,
-                   max_daily_trades, max_position_size, created_at, updated_at
-            FROM users WHERE id = %s
-        """
-        
-        result = session.execute(user_query, (user_id,))
-        user = result.fetchone()
-        
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        return {
-            "success": True,
-            "data": {
-                "user_id": user[0],
-                "username": user[1],
-                "email": user[2],
-                "full_name": user[3],
-                "initial_capital": float(user[4]),
-                "current_balance": float(user[5]),
-                "risk_tolerance": user[6],
-                "is_active": user[7],
-                "trading_enabled": user[8],
-                "max_daily_trades": user[9],
-                "max_position_size": float(user[10]),
-                "created_at": user[11].isoformat(),
-                "last_updated": user[12].isoformat()
-            },
-            "source": "database"
-        }
+        user_data = _user_cache.get(user_id)
+        if user_data is None:
+            async with db_manager.get_async_session() as session:
+                result = await session.execute(_SELECT_USER, {"user_id": user_id})
+                user = result.first()
+            
+            if not user:
+                raise HTTPException(status_code=404, detail="User not found")
+            
+            user_data = dict(user._mapping)
+            _user_cache[user_id] = user_data
+        
+        return _RESP_OK_DB | {"data": user_data}
         
     except HTTPException:
         raise
@@ -202,6 +278,19 @@ async def get_user_details(user_id: int):
         logger.error(f"❌ Failed to get user details: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _with_sk(
+    client_id: str,
+    api_key: str,
+    api_secret: str,
+    fn: Callable[[Any], Awaitable[Any]]
+) -> Any:
+    """Run `fn` with a cached authenticated ShareKhan client (401 on bad credentials)"""
+    try:
+        sharekhan = await get_authenticated_client(client_id, api_key, api_secret)
+    except ShareKhanAuthError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    return await fn(sharekhan)
+
 @router.get("/{user_id}/trading-data")
 async def get_user_trading_data(
     user_id: int,
@@ -216,57 +305,39 @@ async def get_user_trading_data(
     try:
         logger.info(f"📊 Fetching real trading data for user: {user_id}")
         
-        # Verify user exists
-        from src.core.database import db_manager
-        session = db_manager.get_shared_session()
-        
-        user_check = session.execute("SELECT username, full_name FROM users WHERE id = %s", (user_id,))
-        user = user_check.fetchone()
-        
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # Import real ShareKhan client
-        from brokers.sharekhan import ShareKhanIntegration
-        
-        # Initialize ShareKhan with provided credentials
-        sharekhan = ShareKhanIntegration()
-        auth_result = await sharekhan.authenticate(
-            client_id=sharekhan_client_id,
-            api_key=sharekhan_api_key,
-            api_secret=sharekhan_api_secret
+        # Fetch real trading data
+        trading_data = await _with_sk(
+            sharekhan_client_id, sharekhan_api_key, sharekhan_api_secret,
+            lambda sk: fetch_comprehensive_trading_data(sk, sharekhan_client_id)
         )
+        if trading_data.get('error'):
+            # Session may have expired; re-authenticate on the next request
+            invalidate_client(sharekhan_client_id)
         
-        if not auth_result.get('success'):
-            raise HTTPException(
-                status_code=401, 
-                detail=f"ShareKhan authentication failed: {auth_result.get('error')}"
-            )
+        # Update user's current balance with real data and verify the user exists
+        # in the same roundtrip (balance is left untouched when unavailable)
+        current_balance = None
+        if trading_data.get('account_balance'):
+            current_balance = trading_data['account_balance'].get('available_balance')
         
-        # Fetch real trading data
-        trading_data = await fetch_comprehensive_trading_data(sharekhan, sharekhan_client_id)
+        async with db_manager.async_session_scope() as session:
+            result = await session.execute(_UPDATE_BALANCE_RETURNING, {
+                "current_balance": current_balance,
+                "user_id": user_id
+            })
+            user = result.first()
+        _user_cache.pop(user_id, None)
+        if current_balance is not None:
+            await _invalidate_users_list_cache()
         
-        # Update user's current balance with real data
-        if trading_data.get('account_balance'):
-            update_query = """
-                UPDATE users 
-                SET current_balance = %s, updated_at = %s 
-                WHERE id = %s
-            """
-            session.execute(update_query, (
-                trading_data['account_balance']['available_balance'], 
-                datetime.now(), 
-                user_id
-            ))
-            session.commit()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
         
-        return {
-            "success": True,
+        return _RESP_OK_LIVE | {
             "user_id": user_id,
             "username": user[0],
             "full_name": user[1],
             "data": trading_data,
-            "source": "sharekhan_live",
             "timestamp": datetime.now().isoformat()
         }
         
@@ -276,14 +347,17 @@ async def get_user_trading_data(
         logger.error(f"❌ Failed to get trading data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _guarded(coro):
+    """Await a ShareKhan call under the shared concurrency cap"""
+    async with _SK_SEM:
+        return await coro
+
 async def fetch_comprehensive_trading_data(sharekhan, client_id: str) -> Dict[str, Any]:
     """Fetch comprehensive trading data from ShareKhan"""
     try:
         logger.info(f"📊 Fetching comprehensive data for client: {client_id}")
         
         # Fetch all real data in parallel
-        import asyncio
-        
         tasks = {
             'account_balance': sharekhan.get_account_balance(client_id),
             'positions': sharekhan.get_positions(client_id),
@@ -294,14 +368,17 @@ async def fetch_comprehensive_trading_data(sharekhan, client_id: str) -> Dict[st
             'holdings': sharekhan.get_holdings(client_id)
         }
         
-        # Execute all requests concurrently
+        # Execute all requests concurrently; one failure does not abort the others
+        keys = list(tasks)
+        gathered = await asyncio.gather(*(_guarded(tasks[k]) for k in keys), return_exceptions=True)
+        
         results = {}
-        for key, task in tasks.items():
-            try:
-                results[key] = await task
-            except Exception as e:
-                logger.error(f"❌ Failed to fetch {key}: {e}")
-                results[key] = {"error": str(e), "data": []}
+        for key, result in zip(keys, gathered):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Failed to fetch {key}: {result}")
+                results[key] = {"error": str(result), "data": []}
+            else:
+                results[key] = result
         
         # Calculate summary metrics
         summary = calculate_trading_summary(results)
@@ -346,10 +423,10 @@ def calculate_trading_summary(data: Dict[str, Any]) -> Dict[str, Any]:
             summary['total_trades'] = len(data['trades']['data'])
         
         if data.get('positions') and 'data' in data['positions']:
-            summary['open_positions'] = len([p for p in data['positions']['data'] if p.get('quantity', 0) != 0])
+            summary['open_positions'] = sum(1 for p in data['positions']['data'] if p.get('quantity', 0) != 0)
         
         if data.get('orders') and 'data' in data['orders']:
-            summary['pending_orders'] = len([o for o in data['orders']['data'] if o.get('status') in ['PENDING', 'OPEN']])
+            summary['pending_orders'] = sum(1 for o in data['orders']['data'] if o.get('status') in _PENDING_STATES)
         
         if data.get('account_balance') and 'data' in data['account_balance']:
             balance_data = data['account_balance']['data']
@@ -372,19 +449,17 @@ async def sync_user_positions(
 ):
     """Sync real positions from ShareKhan for a user"""
     try:
-        from src.core.real_position_manager import get_position_manager
-        
         position_manager = await get_position_manager()
         
-        sync_result = await position_manager.sync_user_positions(
-            user_id=user_id,
-            sharekhan_client_id=sharekhan_client_id,
-            sharekhan_api_key=sharekhan_api_key,
-            sharekhan_api_secret=sharekhan_api_secret
+        return await _with_sk(
+            sharekhan_client_id, sharekhan_api_key, sharekhan_api_secret,
+            lambda sk: position_manager.sync_user_positions(
+                user_id, sharekhan_client_id, sharekhan_api_key, sharekhan_api_secret, sharekhan=sk
+            )
         )
         
-        return sync_result
-        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Position sync failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -393,8 +468,6 @@ async def sync_user_positions(
 async def get_user_positions(user_id: int):
     """Get user positions from database"""
     try:
-        from src.core.real_position_manager import get_position_manager
-        
         position_manager = await get_position_manager()
         positions_result = await position_manager.get_user_positions(user_id)
         
@@ -413,19 +486,17 @@ async def update_position_prices(
 ):
     """Update current prices and P&L for user positions"""
     try:
-        from src.core.real_position_manager import get_position_manager
-        
         position_manager = await get_position_manager()
         
-        update_result = await position_manager.update_position_prices(
-            user_id=user_id,
-            sharekhan_client_id=sharekhan_client_id,
-            sharekhan_api_key=sharekhan_api_key,
-            sharekhan_api_secret=sharekhan_api_secret
+        return await _with_sk(
+            sharekhan_client_id, sharekhan_api_key, sharekhan_api_secret,
+            lambda sk: position_manager.update_position_prices(
+                user_id, sharekhan_client_id, sharekhan_api_key, sharekhan_api_secret, sharekhan=sk
+            )
         )
         
-        return update_result
-        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Position price update failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -434,28 +505,24 @@ async def update_position_prices(
 async def delete_user(user_id: int):
     """Delete a user (for testing/cleanup)"""
     try:
-        from src.core.database import db_manager
-        
-        session = db_manager.get_shared_session()
-        
-        # Check if user exists
-        user_check = session.execute("SELECT username FROM users WHERE id = %s", (user_id,))
-        user = user_check.fetchone()
-        
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # Delete user (CASCADE will handle related records)
-        delete_query = "DELETE FROM users WHERE id = %s"
-        session.execute(delete_query, (user_id,))
-        session.commit()
+        async with db_manager.async_session_scope() as session:
+            # Check if user exists
+            user_check = await session.execute(
+                _SELECT_USERNAME, {"user_id": user_id}
+            )
+            user = user_check.first()
+            
+            if not user:
+                raise HTTPException(status_code=404, detail="User not found")
+            
+            # Delete user (CASCADE will handle related records)
+            await session.execute(_DELETE_USER, {"user_id": user_id})
+        _user_cache.pop(user_id, None)
+        await _invalidate_users_list_cache()
         
         logger.info(f"✅ User deleted: {user[0]} (ID: {user_id})")
         
-        return {
-            "success": True,
-            "message": f"User {user[0]} (ID: {user_id}) deleted successfully"
-        }
+        return _RESP_OK | {"message": f"User {user[0]} (ID: {user_id}) deleted successfully"}
         
     except HTTPException:
         raise
@@ -6,6 +6,7 @@ Provides endpoints to start, stop, and monitor the ShareKhan orchestrator
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Any
 import os
+import time
 import logging
 from datetime import datetime
 
@@ -15,10 +16,20 @@ router = APIRouter(prefix="/api/system", tags=["system-control"])
 # Global orchestrator reference
 global_orchestrator = None
 
+# Short-lived cache of the status payload: (monotonic timestamp, status dict)
+_STATUS_TTL = 1.0
+_status_cache = (0.0, None)
+
+def _invalidate_status_cache():
+    """Drop the cached status so orchestrator state changes are visible immediately"""
+    global _status_cache
+    _status_cache = (0.0, None)
+
 @router.post("/start-orchestrator")
 async def start_orchestrator():
     """Start the ShareKhan orchestrator manually"""
     global global_orchestrator
+    ts = datetime.now().isoformat()
     
     try:
         logger.info("🚀 Manual orchestrator start requested...")
@@ -53,6 +64,7 @@ async def start_orchestrator():
             # Start the orchestrator
             if hasattr(global_orchestrator, 'start') and callable(global_orchestrator.start):
                 await global_orchestrator.start()
+            _invalidate_status_cache()
             
             return {
                 "success": True,
@@ -60,13 +72,13 @@ async def start_orchestrator():
                 "status": global_orchestrator.health_status,
                 "initialized": global_orchestrator.is_initialized,
                 "running": getattr(global_orchestrator, 'is_running', False),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": ts
             }
         else:
             return {
                 "success": False,
                 "message": "Failed to initialize ShareKhan orchestrator",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": ts
             }
             
     except Exception as e:
@@ -74,44 +86,63 @@ async def start_orchestrator():
         return {
             "success": False,
             "message": f"Orchestrator start failed: {str(e)}",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": ts
         }
 
+async def _build_status() -> Dict[str, Any]:
+    """Build the orchestrator status payload"""
+    global global_orchestrator
+    now = datetime.now()
+    ts = now.isoformat()
+    
+    # Try to get existing orchestrator
+    if not global_orchestrator:
+        try:
+            from src.core.sharekhan_orchestrator import ShareKhanTradingOrchestrator
+            global_orchestrator = await ShareKhanTradingOrchestrator.get_instance()
+        except Exception:
+            pass
+    
+    if global_orchestrator:
+        return {
+            "orchestrator_status": "running" if getattr(global_orchestrator, 'is_running', False) else "stopped",
+            "health_status": getattr(global_orchestrator, 'health_status', 'unknown'),
+            "initialized": getattr(global_orchestrator, 'is_initialized', False),
+            "error_count": getattr(global_orchestrator, 'error_count', 0),
+            "last_health_check": getattr(global_orchestrator, 'last_health_check', now).isoformat(),
+            "active_users": 0,  # Placeholder
+            "total_trades": 0,  # Placeholder
+            "timestamp": ts
+        }
+    
+    return {
+        "orchestrator_status": "unknown",
+        "health_status": "not_initialized",
+        "initialized": False,
+        "error_count": 0,
+        "active_users": 0,
+        "total_trades": 0,
+        "timestamp": ts
+    }
+
+async def _cached_status() -> Dict[str, Any]:
+    """Return the status payload, rebuilding it at most once per TTL"""
+    global _status_cache
+    
+    now = time.monotonic()
+    cached_at, payload = _status_cache
+    if payload is not None and now - cached_at < _STATUS_TTL:
+        return payload
+    
+    payload = await _build_status()
+    _status_cache = (now, payload)
+    return payload
+
 @router.get("/orchestrator-status")
 async def get_orchestrator_status():
     """Get current orchestrator status"""
-    global global_orchestrator
-    
     try:
-        # Try to get existing orchestrator
-        if not global_orchestrator:
-            try:
-                from src.core.sharekhan_orchestrator import ShareKhanTradingOrchestrator
-                global_orchestrator = await ShareKhanTradingOrchestrator.get_instance()
-            except Exception:
-                pass
-        
-        if global_orchestrator:
-            status = {
-                "orchestrator_status": "running" if getattr(global_orchestrator, 'is_running', False) else "stopped",
-                "health_status": getattr(global_orchestrator, 'health_status', 'unknown'),
-                "initialized": getattr(global_orchestrator, 'is_initialized', False),
-                "error_count": getattr(global_orchestrator, 'error_count', 0),
-                "last_health_check": getattr(global_orchestrator, 'last_health_check', datetime.now()).isoformat(),
-                "active_users": 0,  # Placeholder
-                "total_trades": 0,  # Placeholder
-                "timestamp": datetime.now().isoformat()
-            }
-        else:
-            status = {
-                "orchestrator_status": "unknown",
-                "health_status": "not_initialized",
-                "initialized": False,
-                "error_count": 0,
-                "active_users": 0,
-                "total_trades": 0,
-                "timestamp": datetime.now().isoformat()
-            }
+        status = await _cached_status()
         
         return {
             "success": True,
@@ -136,21 +167,23 @@ async def get_orchestrator_status():
 async def stop_orchestrator():
     """Stop the ShareKhan orchestrator"""
     global global_orchestrator
+    ts = datetime.now().isoformat()
     
     try:
         if global_orchestrator and hasattr(global_orchestrator, 'stop'):
             await global_orchestrator.stop()
+            _invalidate_status_cache()
             
             return {
                 "success": True,
                 "message": "Orchestrator stopped successfully",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": ts
             }
         else:
             return {
                 "success": False,
                 "message": "No orchestrator instance available to stop",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": ts
             }
             
     except Exception as e:
@@ -158,5 +191,5 @@ async def stop_orchestrator():
         return {
             "success": False,
             "message": f"Failed to stop orchestrator: {str(e)}",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": ts
         } 
\ No newline at end of file
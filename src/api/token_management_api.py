@@ -3,63 +3,218 @@ Token Management API for Daily Authentication Tokens
 Handles daily token submission and status tracking for all users
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
+from functools import lru_cache
+import asyncio
 import logging
 import random
+import time
+import weakref
+from array import array
+
+import numpy as np
 
 from .auth_api import get_current_user
 
+try:
+    from ciso8601 import parse_datetime as _parse_iso
+except ImportError:
+    def _parse_iso(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/auth", tags=["token-management"])
+router = APIRouter(prefix="/api/auth", tags=["token-management"], default_response_class=ORJSONResponse)
 
 # Pydantic Models
 class DailyTokenSubmission(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     token: str
     broker_type: str = "sharekhan"
     user_id: Optional[str] = None
     expires_at: Optional[str] = None
 
 class TokenStatusResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     sharekhan_status: str
     sharekhan_expires_at: Optional[str]
     last_updated: str
 
+# Tokens within this many seconds of expiry are reported as "expiring"
+_EXPIRING_WINDOW = 4 * 3600
+
+# Default token lifetime, jittered by +/-10% so bulk submissions don't expire together
+_DEFAULT_TOKEN_TTL = timedelta(days=1)
+_TTL_JITTER = 0.1
+
+def _default_expiry(now: datetime) -> datetime:
+    """Default expiry for a newly submitted token, spread around the base TTL"""
+    base = _DEFAULT_TOKEN_TTL.total_seconds()
+    return now + timedelta(seconds=base + random.uniform(-base * _TTL_JITTER, base * _TTL_JITTER))
+
+# Per-user locks serialising token submissions so a row and its cached status change together;
+# a lock disappears once no submission holds or waits on it, so arbitrary user_ids cannot pile up
+_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def _user_lock(user_id: str) -> asyncio.Lock:
+    lock = _locks.get(user_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _locks[user_id] = lock
+    return lock
+
+# Cached (status, next_transition_ts) per user; status only changes at two instants
+_STATUS_CACHE: Dict[str, Tuple[str, float]] = {}
+
+@lru_cache(maxsize=4096)
+def _parse_expiry_ts(expires_at: str) -> float:
+    """Convert an ISO expiry string to a Unix timestamp; repeated strings hit the cache"""
+    return _parse_iso(expires_at).timestamp()
+
+def _status_for(expires_ts: float, now_ts: float) -> Tuple[str, float]:
+    """Classify a token and return the time at which its status next changes"""
+    time_until_expiry = expires_ts - now_ts
+    
+    if time_until_expiry < 0:
+        return "expired", float("inf")
+    elif time_until_expiry < _EXPIRING_WINDOW:
+        return "expiring", expires_ts
+    return "active", expires_ts - _EXPIRING_WINDOW
+
+def _token_status(user_id: str, expires_ts: float, now_ts: float) -> str:
+    """Status for a user's token, recomputed only after its next transition"""
+    cached = _STATUS_CACHE.get(user_id)
+    if cached is not None and now_ts < cached[1]:
+        return cached[0]
+    
+    cached = _status_for(expires_ts, now_ts)
+    _STATUS_CACHE[user_id] = cached
+    return cached[0]
+
+class _TokenStore:
+    """Struct-of-arrays token storage: one column per field plus a user_id -> row index"""
+    
+    def __init__(self):
+        self.version = 0  # Bumped on every write; part of the listing ETags
+        self._index: Dict[str, int] = {}
+        self.user_ids: List[str] = []
+        self.usernames: List[str] = []
+        self.tokens: List[str] = []
+        self.token_previews: List[str] = []
+        self.token_types: List[str] = []
+        self.expires_at: List[str] = []
+        self.expires_ts = array('d')
+        self.statuses: List[str] = []
+        self.last_used: List[str] = []
+        self.auth_urls: List[Optional[str]] = []
+    
+    def __len__(self) -> int:
+        return len(self.user_ids)
+    
+    def upsert(
+        self,
+        user_id: str,
+        username: str,
+        token: str,
+        token_type: str,
+        expires_at: str,
+        status: str,
+        last_used: str,
+        auth_url: Optional[str] = None
+    ):
+        """Insert a user's token row or overwrite it in place"""
+        # Normalize once here so readers can index columns without fallbacks
+        username = username or "Unknown"
+        token_type = token_type or "sharekhan_daily"
+        expires_ts = _parse_expiry_ts(expires_at)
+        self.version += 1
+        idx = self._index.get(user_id)
+        if idx is None:
+            self._index[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+            self.usernames.append(username)
+            self.tokens.append(token)
+            self.token_previews.append(token[:8] + "...")  # Truncated for security
+            self.token_types.append(token_type)
+            self.expires_at.append(expires_at)
+            self.expires_ts.append(expires_ts)
+            self.statuses.append(status)
+            self.last_used.append(last_used)
+            self.auth_urls.append(auth_url)
+        else:
+            self.usernames[idx] = username
+            self.tokens[idx] = token
+            self.token_previews[idx] = token[:8] + "..."
+            self.token_types[idx] = token_type
+            self.expires_at[idx] = expires_at
+            self.expires_ts[idx] = expires_ts
+            self.statuses[idx] = status
+            self.last_used[idx] = last_used
+            self.auth_urls[idx] = auth_url
+    
+    def index_of(self, user_id: str) -> Optional[int]:
+        """Row index for a user, or None"""
+        return self._index.get(user_id)
+    
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return a user's token row as a dict, or None"""
+        idx = self._index.get(user_id)
+        if idx is None:
+            return None
+        return {
+            "user_id": user_id,
+            "username": self.usernames[idx],
+            "token": self.tokens[idx],
+            "token_type": self.token_types[idx],
+            "expires_at": self.expires_at[idx],
+            "_expires_ts": self.expires_ts[idx],
+            "status": self.statuses[idx],
+            "last_used": self.last_used[idx],
+            "auth_url": self.auth_urls[idx]
+        }
+
+def _listing_etag(store: _TokenStore, now_ts: float) -> str:
+    """Weak ETag that changes on any write or when any token's status next changes"""
+    expires = np.array(store.expires_ts, dtype=np.float64)
+    transitions = np.concatenate((expires - _EXPIRING_WINDOW, expires))
+    upcoming = transitions[transitions > now_ts]
+    next_transition = int(upcoming.min()) if upcoming.size else 0
+    return f'W/"{store.version}-{next_transition}"'
+
 # Mock token storage with ShareKhan tokens that match frontend expectations
-MOCK_TOKENS = {
-    "user_001": {
-        "user_id": "user_001",
-        "username": "demo_user",
-        "token": "sk_token_demo_123",
-        "token_type": "sharekhan_daily",
-        "expires_at": (datetime.now() + timedelta(days=1)).isoformat(),
-        "status": "active",
-        "last_used": datetime.now().isoformat(),
-        "auth_url": None
-    },
-    "admin_001": {
-        "user_id": "admin_001",
-        "username": "admin_user", 
-        "token": "sk_token_admin_456",
-        "token_type": "sharekhan_daily",
-        "expires_at": (datetime.now() + timedelta(hours=2)).isoformat(),
-        "status": "expiring",
-        "last_used": (datetime.now() - timedelta(hours=1)).isoformat(),
-        "auth_url": None
-    },
-    "trader_001": {
-        "user_id": "trader_001",
-        "username": "pro_trader",
-        "token": "sk_token_trader_789",
-        "token_type": "sharekhan_daily", 
-        "expires_at": (datetime.now() + timedelta(hours=6)).isoformat(),
-        "status": "active",
-        "last_used": datetime.now().isoformat(),
-        "auth_url": None
-    }
-}
+MOCK_TOKENS = _TokenStore()
+MOCK_TOKENS.upsert(
+    user_id="user_001",
+    username="demo_user",
+    token="sk_token_demo_123",
+    token_type="sharekhan_daily",
+    expires_at=(datetime.now() + timedelta(days=1)).isoformat(),
+    status="active",
+    last_used=datetime.now().isoformat()
+)
+MOCK_TOKENS.upsert(
+    user_id="admin_001",
+    username="admin_user",
+    token="sk_token_admin_456",
+    token_type="sharekhan_daily",
+    expires_at=(datetime.now() + timedelta(hours=2)).isoformat(),
+    status="expiring",
+    last_used=(datetime.now() - timedelta(hours=1)).isoformat()
+)
+MOCK_TOKENS.upsert(
+    user_id="trader_001",
+    username="pro_trader",
+    token="sk_token_trader_789",
+    token_type="sharekhan_daily",
+    expires_at=(datetime.now() + timedelta(hours=6)).isoformat(),
+    status="active",
+    last_used=datetime.now().isoformat()
+)
 
 @router.post("/daily")
 async def submit_daily_token(
@@ -69,21 +224,23 @@ async def submit_daily_token(
     """Submit daily authentication token"""
     try:
         user_id = token_data.user_id or current_user["user_id"]
+        now = datetime.now()
         
-        # Calculate expiry (default 24 hours)
-        expires_at = token_data.expires_at or (datetime.now() + timedelta(days=1)).isoformat()
+        # Calculate expiry (default 24 hours, jittered)
+        expires_at = token_data.expires_at or _default_expiry(now).isoformat()
         
         # Store token (in production, use database)
-        MOCK_TOKENS[user_id] = {
-            "user_id": user_id,
-            "username": current_user.get("name", "Unknown"),
-            "token": token_data.token,
-            "token_type": "sharekhan_daily",
-            "expires_at": expires_at,
-            "status": "active", 
-            "last_used": datetime.now().isoformat(),
-            "auth_url": None
-        }
+        async with _user_lock(user_id):
+            MOCK_TOKENS.upsert(
+                user_id=user_id,
+                username=current_user.get("name", "Unknown"),
+                token=token_data.token,
+                token_type="sharekhan_daily",
+                expires_at=expires_at,
+                status="active",
+                last_used=now.isoformat()
+            )
+            _STATUS_CACHE.pop(user_id, None)
         
         logger.info(f"Daily token submitted for user {user_id} by {current_user['email']}")
         
@@ -103,40 +260,45 @@ async def submit_daily_token(
         )
 
 @router.get("/tokens")
-async def get_auth_tokens():
+async def get_auth_tokens(request: Request, response: Response):
     """Get authentication tokens status for all users - matches frontend expectations"""
+    now = datetime.now()
+    now_iso = now.isoformat()
     try:
-        tokens_list = []
-        for user_id, token_data in MOCK_TOKENS.items():
-            # Update status based on expiry
-            expires_at = datetime.fromisoformat(token_data["expires_at"].replace("Z", "+00:00"))
-            time_until_expiry = expires_at - datetime.now(expires_at.tzinfo)
-            
-            if time_until_expiry.total_seconds() < 0:
-                status = "expired"
-            elif time_until_expiry.total_seconds() < 4 * 3600:  # 4 hours
-                status = "expiring" 
-            else:
-                status = "active"
-            
-            # Update the stored status
-            MOCK_TOKENS[user_id]["status"] = status
-            
-            tokens_list.append({
-                "user_id": user_id,
-                "username": token_data["username"],
-                "token": token_data["token"][:8] + "...",  # Truncated for security
-                "token_type": token_data["token_type"],
-                "expires_at": token_data["expires_at"],
-                "status": status,
-                "last_used": token_data["last_used"],
-                "auth_url": token_data.get("auth_url")
-            })
+        now_ts = now.timestamp()
+        store = MOCK_TOKENS
+        
+        # Polling clients get a 304 until a token is written or changes status
+        etag = _listing_etag(store, now_ts)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        
+        user_ids, usernames, token_previews = store.user_ids, store.usernames, store.token_previews
+        token_types, expires_at, expires_ts = store.token_types, store.expires_at, store.expires_ts
+        last_used, auth_urls = store.last_used, store.auth_urls
+        
+        # Derive status from expiry; the stored column is only written on submission
+        row_statuses = [_token_status(uid, ts, now_ts) for uid, ts in zip(user_ids, expires_ts)]
+        
+        tokens_list = [
+            {
+                "user_id": user_ids[i],
+                "username": usernames[i],
+                "token": token_previews[i],
+                "token_type": token_types[i],
+                "expires_at": expires_at[i],
+                "status": row_statuses[i],
+                "last_used": last_used[i],
+                "auth_url": auth_urls[i]
+            }
+            for i in range(len(store))
+        ]
         
         return {
             "success": True,
             "data": tokens_list,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except Exception as e:
@@ -145,39 +307,33 @@ async def get_auth_tokens():
             "success": False,
             "error": str(e),
             "data": [],
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
 
-@router.get("/status", response_model=TokenStatusResponse)
+@router.get("/status", responses={200: {"model": TokenStatusResponse}})
 async def get_token_status(current_user: Dict[str, Any] = Depends(get_current_user)):
     """Get current user's token status"""
     try:
         user_id = current_user["user_id"]
-        user_token = MOCK_TOKENS.get(user_id)
+        store = MOCK_TOKENS
+        idx = store.index_of(user_id)
         
-        if not user_token:
-            return TokenStatusResponse(
+        if idx is None:
+            return ORJSONResponse(content=TokenStatusResponse(
                 sharekhan_status="not_set",
                 sharekhan_expires_at=None,
                 last_updated=datetime.now().isoformat()
-            )
+            ).model_dump())
         
-        # Check if token is expiring (within 4 hours)
-        expires_at = datetime.fromisoformat(user_token["expires_at"].replace("Z", "+00:00"))
-        time_until_expiry = expires_at - datetime.now(expires_at.tzinfo)
+        # Check if token is expiring (within 4 hours) from the stored epoch expiry
+        status = _token_status(user_id, store.expires_ts[idx], time.time())
         
-        if time_until_expiry.total_seconds() < 0:
-            status = "expired"
-        elif time_until_expiry.total_seconds() < 4 * 3600:  # 4 hours
-            status = "expiring"
-        else:
-            status = "active"
-        
-        return TokenStatusResponse(
+        # Built once and serialized directly, skipping FastAPI's response_model re-validation
+        return ORJSONResponse(content=TokenStatusResponse(
             sharekhan_status=status,
-            sharekhan_expires_at=user_token["expires_at"],
-            last_updated=user_token["last_used"]
-        )
+            sharekhan_expires_at=store.expires_at[idx],
+            last_updated=store.last_used[idx]
+        ).model_dump())
         
     except Exception as e:
         logger.error(f"Token status error: {e}")
@@ -187,7 +343,11 @@ async def get_token_status(current_user: Dict[str, Any] = Depends(get_current_us
         )
 
 @router.get("/all-users")
-async def get_all_user_tokens(current_user: Dict[str, Any] = Depends(get_current_user)):
+async def get_all_user_tokens(
+    request: Request,
+    response: Response,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
     """Get token status for all users (admin only)"""
     try:
         # Check if user is admin
@@ -197,28 +357,36 @@ async def get_all_user_tokens(current_user: Dict[str, Any] = Depends(get_current
                 detail="Admin access required"
             )
         
-        all_tokens = []
-        
-        for user_id, token_data in MOCK_TOKENS.items():
-            # Check token status
-            expires_at = datetime.fromisoformat(token_data["expires_at"].replace("Z", "+00:00"))
-            time_until_expiry = expires_at - datetime.now(expires_at.tzinfo)
-            
-            if time_until_expiry.total_seconds() < 0:
-                status = "expired"
-            elif time_until_expiry.total_seconds() < 4 * 3600:
-                status = "expiring" 
-            else:
-                status = "active"
-            
-            all_tokens.append({
-                "user_id": user_id,
-                "username": token_data.get("username", "Unknown"),
-                "token_type": token_data.get("token_type", "sharekhan_daily"),
-                "status": status,
-                "expires_at": token_data["expires_at"],
-                "last_used": token_data["last_used"]
-            })
+        now = datetime.now()
+        store = MOCK_TOKENS
+        
+        etag = _listing_etag(store, now.timestamp())
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        
+        user_ids, usernames, token_types = store.user_ids, store.usernames, store.token_types
+        expires_at, last_used = store.expires_at, store.last_used
+        
+        # Classify every token in one vectorized pass over the epoch expiry column
+        delta = np.array(store.expires_ts, dtype=np.float64) - now.timestamp()
+        statuses = np.select(
+            [delta < 0, delta < _EXPIRING_WINDOW],
+            ["expired", "expiring"],
+            default="active"
+        ).tolist()
+        
+        all_tokens = [
+            {
+                "user_id": user_ids[i],
+                "username": usernames[i],
+                "token_type": token_types[i],
+                "status": statuses[i],
+                "expires_at": expires_at[i],
+                "last_used": last_used[i]
+            }
+            for i in range(len(store))
+        ]
         
         logger.info(f"All user tokens requested by admin: {current_user['email']}")
         
@@ -226,7 +394,7 @@ async def get_all_user_tokens(current_user: Dict[str, Any] = Depends(get_current
             "success": True,
             "tokens": all_tokens,
             "total_users": len(all_tokens),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now.isoformat()
         }
         
     except HTTPException:
@@ -1,16 +1,80 @@
 """
 Trading Control API - Start/Stop Trading and User Management
 """
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import ORJSONResponse
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+from collections.abc import MutableMapping
+from array import array
+from functools import lru_cache
 import logging
 import os
 import asyncio
-from pydantic import BaseModel
+import operator
+import types
+from urllib.parse import parse_qs
+import orjson
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
+
+from src.utils.clock import now_iso
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+def _load_env() -> types.SimpleNamespace:
+    """Snapshot of the environment settings this module reads"""
+    return types.SimpleNamespace(
+        master_user_id=os.getenv('SHAREKHAN_USER_ID', 'QSW899'),
+        api_key=os.getenv('SHAREKHAN_API_KEY'),
+        api_secret=os.getenv('SHAREKHAN_API_SECRET'),
+        client_id=os.getenv('SHAREKHAN_CLIENT_ID'),
+        redis_host=os.getenv('REDIS_HOST', 'localhost'),
+        redis_port=int(os.getenv('REDIS_PORT', 6379)),
+        redis_password=os.getenv('REDIS_PASSWORD'),
+        redis_ssl=os.getenv('REDIS_SSL', 'false').lower() == 'true',
+        sharekhan_username=os.getenv('SHAREKHAN_USERNAME', 'tdwsp697'),
+        sharekhan_password=os.getenv('SHAREKHAN_PASSWORD', 'shyam@697'),
+        sharekhan_url=os.getenv('SHAREKHAN_URL', 'push.sharekhan.in'),
+        sharekhan_port=int(os.getenv('SHAREKHAN_PORT', 8084))
+    )
+
+def _build_trading_config(env: types.SimpleNamespace) -> Dict[str, Any]:
+    """Trading-start config derived from the environment snapshot"""
+    return {
+        'redis': {
+            'host': env.redis_host,
+            'port': env.redis_port,
+            'password': env.redis_password,
+            'ssl': env.redis_ssl
+        },
+        'broker': {
+            'api_key': env.api_key,
+            'api_secret': env.api_secret,
+            'client_id': env.client_id
+        },
+        'data_provider': {
+            'username': env.sharekhan_username,
+            'password': env.sharekhan_password,
+            'url': env.sharekhan_url,
+            'port': env.sharekhan_port
+        },
+        'strategies': {
+            'volatility_explosion': {'enabled': True},
+            'momentum_surfer': {'enabled': True},
+            'volume_profile_scalper': {'enabled': True},
+            'news_impact_scalper': {'enabled': True}
+        }
+    }
+
+# Environment read once at import; changes after startup require a process restart (or _reload_env())
+_ENV = _load_env()
+_TRADING_CONFIG = _build_trading_config(_ENV)
+
+def _reload_env():
+    """Re-read the environment (from tests or after an intentional reconfiguration)"""
+    global _ENV, _TRADING_CONFIG
+    _ENV = _load_env()
+    _TRADING_CONFIG = _build_trading_config(_ENV)
 
 # Global trading state
 trading_state = {
@@ -33,24 +97,232 @@ class BrokerUser(BaseModel):
     risk_tolerance: str = "medium"
     paper_trading: bool = True
 
+class PartialBrokerUser(BaseModel):
+    """Partial broker user update; only the supplied fields are applied"""
+    model_config = ConfigDict(extra='ignore')
+    
+    name: Optional[str] = None
+    broker: Optional[str] = None
+    api_key: Optional[str] = None
+    api_secret: Optional[str] = None
+    client_id: Optional[str] = None
+    initial_capital: Optional[float] = None
+    risk_tolerance: Optional[str] = None
+    paper_trading: Optional[bool] = None
+
+_partial_broker_user_adapter = TypeAdapter(PartialBrokerUser)
+
 class TradingCommand(BaseModel):
     """Model for trading control commands"""
     action: str  # start, stop, pause, resume
 
+class _UserRow(MutableMapping):
+    """Live view of one broker user; reads and writes go straight to the table columns"""
+    __slots__ = ("_table", "_user_id")
+    
+    def __init__(self, table: "UserTable", user_id: str):
+        self._table = table
+        self._user_id = user_id
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._table._read(self._table.idx[self._user_id], key)
+    
+    def __setitem__(self, key: str, value: Any):
+        if key == "user_id" and value != self._user_id:
+            raise ValueError("user_id cannot be changed in place")
+        self._table._write(self._table.idx[self._user_id], key, value)
+    
+    def __delitem__(self, key: str):
+        if key in self._table._columns:
+            raise KeyError(f"{key} is a required column")
+        del self._table.extras[self._table.idx[self._user_id]][key]
+    
+    def __iter__(self) -> Iterator[str]:
+        yield from self._table._columns
+        yield from self._table.extras[self._table.idx[self._user_id]]
+    
+    def __len__(self) -> int:
+        return len(self._table._columns) + len(self._table.extras[self._table.idx[self._user_id]])
+
+class UserTable(MutableMapping):
+    """
+    Struct-of-arrays broker user storage: one column per listed field plus a user_id -> row index.
+    Behaves like the previous dict-of-dicts; rows are returned as live _UserRow views.
+    """
+    
+    _FLOAT_FIELDS = ("initial_capital", "current_capital", "total_pnl", "daily_pnl", "win_rate")
+    _INT_FIELDS = ("total_trades", "open_trades")
+    _FLAG_FIELDS = ("paper_trading", "is_active")
+    
+    def __init__(self):
+        self.version = 0  # Bumped on every write; keys the serialized listing caches
+        self.idx: Dict[str, int] = {}
+        # Maintained on every is_master write/removal so the master lookup is O(1)
+        self.master_user_id: Optional[str] = None
+        self.user_id: List[str] = []
+        self.name: List[str] = []
+        self.initial_capital = array('d')
+        self.current_capital = array('d')
+        self.total_pnl = array('d')
+        self.daily_pnl = array('d')
+        self.win_rate = array('d')
+        self.total_trades = array('q')
+        self.open_trades = array('q')
+        self.paper_trading = bytearray()
+        self.is_active = bytearray()
+        # Credentials, profile and other per-user fields not needed for listings
+        self.extras: List[Dict[str, Any]] = []
+        self._columns = {
+            field: getattr(self, field)
+            for field in ("user_id", "name") + self._FLOAT_FIELDS + self._INT_FIELDS + self._FLAG_FIELDS
+        }
+    
+    def _read(self, i: int, key: str) -> Any:
+        column = self._columns.get(key)
+        if column is None:
+            return self.extras[i][key]
+        value = column[i]
+        return bool(value) if key in self._FLAG_FIELDS else value
+    
+    def _write(self, i: int, key: str, value: Any):
+        self.version += 1
+        column = self._columns.get(key)
+        if column is None:
+            self.extras[i][key] = value
+            if key == "is_master":
+                user_id = self.user_id[i]
+                if value:
+                    self.master_user_id = user_id
+                elif self.master_user_id == user_id:
+                    self.master_user_id = None
+        elif key in self._FLOAT_FIELDS:
+            column[i] = float(value)
+        elif key in self._INT_FIELDS:
+            column[i] = int(value)
+        elif key in self._FLAG_FIELDS:
+            column[i] = 1 if value else 0
+        else:
+            column[i] = value
+    
+    def __getitem__(self, user_id: str) -> _UserRow:
+        if user_id not in self.idx:
+            raise KeyError(user_id)
+        return _UserRow(self, user_id)
+    
+    def __setitem__(self, user_id: str, record: Dict[str, Any]):
+        """Insert a user or replace their whole record"""
+        i = self.idx.get(user_id)
+        if i is None:
+            i = len(self.user_id)
+            self.idx[user_id] = i
+            for field, column in self._columns.items():
+                column.append(0 if field not in ("user_id", "name") else "")
+            self.extras.append({})
+        else:
+            self.extras[i] = {}
+            if self.master_user_id == user_id:
+                self.master_user_id = None
+        self.user_id[i] = user_id
+        for key, value in record.items():
+            self._write(i, key, value)
+    
+    def __delitem__(self, user_id: str):
+        i = self.idx.pop(user_id)
+        self.version += 1
+        if self.master_user_id == user_id:
+            self.master_user_id = None
+        for column in self._columns.values():
+            del column[i]
+        del self.extras[i]
+        for moved in self.user_id[i:]:
+            self.idx[moved] -= 1
+    
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self.idx
+    
+    def get(self, user_id: str, default=None):
+        """Row view for a user, or default (one index probe)"""
+        return _UserRow(self, user_id) if user_id in self.idx else default
+    
+    def __iter__(self) -> Iterator[str]:
+        # Iterate a snapshot: callers may await mid-loop while other coroutines add or remove users
+        return iter(tuple(self.user_id))
+    
+    def __len__(self) -> int:
+        return len(self.user_id)
+    
+    def items(self) -> Iterator[Tuple[str, _UserRow]]:
+        """(user_id, row) pairs from a snapshot, skipping users removed mid-iteration"""
+        for user_id in tuple(self.user_id):
+            if user_id in self.idx:
+                yield user_id, _UserRow(self, user_id)
+    
+    def values(self) -> Iterator[_UserRow]:
+        """Rows from a snapshot, skipping users removed mid-iteration"""
+        for _, row in self.items():
+            yield row
+    
+    def pop(self, user_id: str, *default):
+        """Remove a user and return a plain-dict snapshot of their record"""
+        if user_id not in self.idx:
+            if default:
+                return default[0]
+            raise KeyError(user_id)
+        record = dict(self[user_id])
+        del self[user_id]
+        return record
+
 # In-memory user storage (replace with database in production)
-broker_users = {}
+broker_users = UserTable()
+
+# Columns read by the /users/broker listing, fetched from the table in one C-level call
+_LISTING_COLUMNS = operator.attrgetter(
+    "user_id", "name", "initial_capital", "current_capital", "total_pnl", "daily_pnl",
+    "total_trades", "win_rate", "is_active", "open_trades", "paper_trading"
+)
+
+# Defaults shared by every broker user record
+_USER_TEMPLATE: Dict[str, Any] = {
+    "broker": "sharekhan",
+    "initial_capital": 0.0,  # Will be dynamically fetched from ShareKhan API
+    "current_capital": 0.0,  # Will be dynamically fetched from ShareKhan API
+    "risk_tolerance": "medium",
+    "paper_trading": True,  # Can be toggled per user
+    "is_active": True,
+    "total_pnl": 0,
+    "daily_pnl": 0,
+    "total_trades": 0,
+    "win_rate": 0,
+    "open_trades": 0
+}
 
+def _make_user_record(**overrides) -> Dict[str, Any]:
+    """New broker user record: the shared defaults plus per-user fields"""
+    return {**_USER_TEMPLATE, "created_at": now_iso(), **overrides}
+
+def _build_master_user_dict(master_sharekhan_user_id: str, api_key: Optional[str], api_secret: Optional[str]) -> Dict[str, Any]:
+    """Master ShareKhan account record, keyed by the real ShareKhan user ID"""
+    return _make_user_record(
+        user_id=master_sharekhan_user_id,  # Use real ShareKhan user ID
+        name=f"ShareKhan Account ({master_sharekhan_user_id})",
+        api_key=api_key,
+        api_secret=api_secret,
+        client_id=master_sharekhan_user_id,  # Same as user_id for ShareKhan
+        is_master=True  # Mark as master account
+    )
+
+@lru_cache(maxsize=1)
 def initialize_default_users():
-    """Initialize master trading account dynamically based on environment ShareKhan user"""
+    """Initialize master trading account dynamically based on environment ShareKhan user (once per process)"""
     try:
         # Get the master ShareKhan user ID from environment (this is the primary trading account)
-        master_sharekhan_user_id = os.getenv('SHAREKHAN_USER_ID', 'QSW899')
+        master_sharekhan_user_id = _ENV.master_user_id
         
         # Only add if master user doesn't exist (prevent duplicates)
         if master_sharekhan_user_id not in broker_users:
             # Use actual production deployment credentials from environment
-            real_api_key = os.getenv('SHAREKHAN_API_KEY')
-            real_api_secret = os.getenv('SHAREKHAN_API_SECRET')
+            real_api_key = _ENV.api_key
+            real_api_secret = _ENV.api_secret
             
             # Ensure we have the required credentials
             if not real_api_key or not real_api_secret:
@@ -58,73 +330,40 @@ def initialize_default_users():
                 logger.error("Required: SHAREKHAN_API_KEY and SHAREKHAN_API_SECRET")
                 return
                 
-            logger.info(f"✅ Using ShareKhan API key: {real_api_key[:8]}...")
+            logger.info("✅ Using ShareKhan API key: %s...", real_api_key[:8])
             
             # Create master user with ACTUAL ShareKhan user ID as the key
-            master_user = {
-                "user_id": master_sharekhan_user_id,  # Use real ShareKhan user ID
-                "name": f"ShareKhan Account ({master_sharekhan_user_id})",
-                "broker": "sharekhan",
-                "api_key": real_api_key,
-                "api_secret": real_api_secret,
-                "client_id": master_sharekhan_user_id,  # Same as user_id for ShareKhan
-                "initial_capital": 0.0,  # Will be dynamically fetched from ShareKhan API
-                "current_capital": 0.0,  # Will be dynamically fetched from ShareKhan API
-                "risk_tolerance": "medium",
-                "paper_trading": True,  # Can be toggled per user
-                "is_active": True,
-                "is_master": True,  # Mark as master account
-                "created_at": datetime.now().isoformat(),
-                "total_pnl": 0,
-                "daily_pnl": 0,
-                "total_trades": 0,
-                "win_rate": 0,
-                "open_trades": 0
-            }
-            
-            broker_users[master_sharekhan_user_id] = master_user
+            broker_users[master_sharekhan_user_id] = _build_master_user_dict(
+                master_sharekhan_user_id, real_api_key, real_api_secret
+            )
             
-            logger.info(f"✅ Initialized master ShareKhan user: {master_sharekhan_user_id}")
-            logger.info(f"✅ Using API key: {real_api_key[:8]}...")
+            logger.info("✅ Initialized master ShareKhan user: %s", master_sharekhan_user_id)
+            logger.info("✅ Using API key: %s...", real_api_key[:8])
             logger.info("✅ System ready for multi-user ShareKhan trading")
             
             return True
         else:
-            logger.info(f"✅ Master user {master_sharekhan_user_id} already exists - skipping initialization")
+            logger.info("✅ Master user %s already exists - skipping initialization", master_sharekhan_user_id)
             return True
     except Exception as e:
-        logger.error(f"❌ Error initializing default users: {e}")
+        logger.error("❌ Error initializing default users: %s", e)
         return False
 
-# Auto-initialize default users on module import
-try:
-    initialize_default_users()
-    logger.info(f"✅ Default users initialized. Active users: {list(broker_users.keys())}")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize default users: {e}")
-    # CRITICAL FIX: Force initialization as fallback with CORRECT production credentials
-    master_sharekhan_user_id = os.getenv('SHAREKHAN_USER_ID', 'QSW899')
-    broker_users[master_sharekhan_user_id] = {
-        "user_id": master_sharekhan_user_id,
-        "name": f"ShareKhan Account ({master_sharekhan_user_id})", 
-        "broker": "sharekhan",
-                        "api_key": os.getenv('SHAREKHAN_API_KEY'),  # Use actual production key
-                        "api_secret": os.getenv('SHAREKHAN_API_SECRET'),  # Use actual production secret
-        "client_id": master_sharekhan_user_id,
-        "initial_capital": 0.0,  # Will be dynamically fetched from ShareKhan API
-        "current_capital": 0.0,  # Will be dynamically fetched from ShareKhan API
-        "risk_tolerance": "medium",
-        "paper_trading": True,
-        "is_active": True,
-        "is_master": True,
-        "created_at": datetime.now().isoformat(),
-        "total_pnl": 0,
-        "daily_pnl": 0,
-        "total_trades": 0,
-        "win_rate": 0,
-        "open_trades": 0
-    }
-    logger.info(f"✅ Forced default user initialization as fallback for {master_sharekhan_user_id}")
+def ensure_default_users():
+    """Startup hook: initialize default users, forcing the master account in as a fallback"""
+    try:
+        initialize_default_users()
+        logger.info("✅ Default users initialized. Active users: %s", list(broker_users.keys()))
+    except Exception as e:
+        logger.error("❌ Failed to initialize default users: %s", e)
+        # CRITICAL FIX: Force initialization as fallback with CORRECT production credentials
+        master_sharekhan_user_id = _ENV.master_user_id
+        broker_users[master_sharekhan_user_id] = _build_master_user_dict(
+            master_sharekhan_user_id,
+            _ENV.api_key,  # Use actual production key
+            _ENV.api_secret  # Use actual production secret
+        )
+        logger.info("✅ Forced default user initialization as fallback for %s", master_sharekhan_user_id)
 
 def create_or_update_sharekhan_user(sharekhan_user_id: str, user_profile: Optional[Dict[str, Any]] = None, api_credentials: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
     """
@@ -133,9 +372,9 @@ def create_or_update_sharekhan_user(sharekhan_user_id: str, user_profile: Option
     """
     try:
         # Check if user already exists
-        if sharekhan_user_id in broker_users:
-            logger.info(f"✅ ShareKhan user {sharekhan_user_id} already exists, updating profile")
-            existing_user = broker_users[sharekhan_user_id]
+        existing_user = broker_users.get(sharekhan_user_id)
+        if existing_user is not None:
+            logger.info("✅ ShareKhan user %s already exists, updating profile", sharekhan_user_id)
             
             # Update profile information if provided
             if user_profile:
@@ -144,7 +383,7 @@ def create_or_update_sharekhan_user(sharekhan_user_id: str, user_profile: Option
                     "email": user_profile.get("email", ""),
                     "phone": user_profile.get("phone", ""),
                     "broker": user_profile.get("broker", "sharekhan"),
-                    "last_login": datetime.now().isoformat()
+                    "last_login": now_iso()
                 })
             
             # Update API credentials if provided (for master accounts)
@@ -157,61 +396,48 @@ def create_or_update_sharekhan_user(sharekhan_user_id: str, user_profile: Option
             return existing_user
         
         # Create new user
-        logger.info(f"✅ Creating new ShareKhan user: {sharekhan_user_id}")
+        logger.info("✅ Creating new ShareKhan user: %s", sharekhan_user_id)
         
         # Determine if this is the master account
-        master_user_id = os.getenv('SHAREKHAN_USER_ID', 'QSW899')
+        master_user_id = _ENV.master_user_id
         is_master = (sharekhan_user_id == master_user_id)
         
-        new_user = {
-            "user_id": sharekhan_user_id,
-            "name": user_profile.get("user_name", f"ShareKhan User ({sharekhan_user_id})") if user_profile else f"ShareKhan User ({sharekhan_user_id})",
-            "email": user_profile.get("email", "") if user_profile else "",
-            "phone": user_profile.get("phone", "") if user_profile else "",
-            "broker": "sharekhan",
-            "client_id": sharekhan_user_id,
-            "initial_capital": 0.0,  # Will be dynamically fetched from ShareKhan API
-            "current_capital": 0.0,  # Will be dynamically fetched from ShareKhan API
-            "risk_tolerance": "medium",
-            "paper_trading": True,  # Start with paper trading, can be toggled
-            "is_active": True,
-            "is_master": is_master,  # Only master account can execute trades for others
-            "created_at": datetime.now().isoformat(),
-            "last_login": datetime.now().isoformat(),
-            "total_pnl": 0,
-            "daily_pnl": 0,
-            "total_trades": 0,
-            "win_rate": 0,
-            "open_trades": 0,
-            "max_daily_loss": 50000.0,  # Default 50K daily loss limit
-            "max_position_size": 100000.0,  # Default 1L position limit
-            "strategies_enabled": ["volume_profile_scalper", "momentum_surfer"]  # Default strategies
-        }
+        profile = user_profile or {}
+        new_user = _make_user_record(
+            user_id=sharekhan_user_id,
+            name=profile.get("user_name", f"ShareKhan User ({sharekhan_user_id})"),
+            email=profile.get("email", ""),
+            phone=profile.get("phone", ""),
+            client_id=sharekhan_user_id,
+            is_master=is_master,  # Only master account can execute trades for others
+            last_login=now_iso(),
+            max_daily_loss=50000.0,  # Default 50K daily loss limit
+            max_position_size=100000.0,  # Default 1L position limit
+            strategies_enabled=["volume_profile_scalper", "momentum_surfer"]  # Default strategies
+        )
         
         # Add API credentials only for master account
         if is_master and api_credentials:
             new_user.update({
-                "api_key": api_credentials.get("api_key", os.getenv('SHAREKHAN_API_KEY')),
-                "api_secret": api_credentials.get("api_secret", os.getenv('SHAREKHAN_API_SECRET'))
+                "api_key": api_credentials.get("api_key", _ENV.api_key),
+                "api_secret": api_credentials.get("api_secret", _ENV.api_secret)
             })
         
         broker_users[sharekhan_user_id] = new_user
         
-        logger.info(f"✅ Created ShareKhan user {sharekhan_user_id} (Master: {is_master})")
-        logger.info(f"✅ Total users in system: {len(broker_users)}")
+        logger.info("✅ Created ShareKhan user %s (Master: %s)", sharekhan_user_id, is_master)
+        logger.info("✅ Total users in system: %s", len(broker_users))
         
-        return new_user
+        return broker_users[sharekhan_user_id]
         
     except Exception as e:
-        logger.error(f"❌ Failed to create/update user {sharekhan_user_id}: {e}")
+        logger.error("❌ Failed to create/update user %s: %s", sharekhan_user_id, e)
         raise HTTPException(status_code=500, detail=f"User creation failed: {e}")
 
 def get_master_user() -> Optional[Dict[str, Any]]:
     """Get the master ShareKhan user (the one that can execute trades)"""
-    for user_id, user_data in broker_users.items():
-        if user_data.get("is_master", False):
-            return user_data
-    return None
+    master_user_id = broker_users.master_user_id
+    return broker_users[master_user_id] if master_user_id else None
 
 def get_user_by_sharekhan_id(sharekhan_user_id: str) -> Optional[Dict[str, Any]]:
     """Get user by their ShareKhan user ID"""
@@ -219,7 +445,7 @@ def get_user_by_sharekhan_id(sharekhan_user_id: str) -> Optional[Dict[str, Any]]
 
 def list_all_sharekhan_users() -> List[Dict[str, Any]]:
     """List all registered ShareKhan users"""
-    return list(broker_users.values())
+    return [dict(user) for user in broker_users.values()]
 
 @router.post("/users/broker")
 async def add_broker_user(user: BrokerUser):
@@ -240,150 +466,138 @@ async def add_broker_user(user: BrokerUser):
             )
 
         # Store user credentials
-        broker_users[user.user_id] = {
-            "user_id": user.user_id,
-            "name": user.name,
-            "broker": user.broker,
-            "api_key": user.api_key,
-            "api_secret": user.api_secret,
-            "client_id": user.client_id,
-            "initial_capital": user.initial_capital,
-            "current_capital": user.initial_capital,
-            "risk_tolerance": user.risk_tolerance,
-            "paper_trading": user.paper_trading,
-            "is_active": True,
-            "created_at": datetime.now().isoformat(),
-            "total_pnl": 0,
-            "daily_pnl": 0,
-            "total_trades": 0,
-            "win_rate": 0,
-            "open_trades": 0
-        }
-        
-        # Set environment variables for the broker
-        os.environ['SHAREKHAN_API_KEY'] = user.api_key
-        os.environ['SHAREKHAN_API_SECRET'] = user.api_secret
-        os.environ['SHAREKHAN_CLIENT_ID'] = user.client_id
-        os.environ['PAPER_TRADING'] = str(user.paper_trading).lower()
+        broker_users[user.user_id] = _make_user_record(
+            user_id=user.user_id,
+            name=user.name,
+            broker=user.broker,
+            api_key=user.api_key,
+            api_secret=user.api_secret,
+            client_id=user.client_id,
+            initial_capital=user.initial_capital,
+            current_capital=user.initial_capital,
+            risk_tolerance=user.risk_tolerance,
+            paper_trading=user.paper_trading
+        )
         
-        logger.info(f"Added broker user: {user.user_id} for {user.broker} trading")
+        logger.info("Added broker user: %s for %s trading", user.user_id, user.broker)
         
         return {
             "success": True,
             "message": f"Broker user {user.user_id} added successfully",
-            "user": broker_users[user.user_id]
+            "user": dict(broker_users[user.user_id])
         }
         
     except HTTPException as he:
-        logger.error(f"Validation error adding broker user: {he.detail}")
+        logger.error("Validation error adding broker user: %s", he.detail)
         raise
     except Exception as e:
-        logger.error(f"Error adding broker user: {e}")
+        logger.error("Error adding broker user: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+# Encoded once; a fresh Response wraps it per call because middleware may append to response headers
+_EMPTY_USERS_BODY = orjson.dumps({"success": True, "users": []})
+
+# Serialized listing bodies keyed by endpoint: (table version, body)
+_user_list_cache: Dict[str, Tuple[int, bytes]] = {}
+
+def _cached_listing(key: str, build) -> Response:
+    """Serve a listing body from cache until broker_users is written to"""
+    version = broker_users.version
+    cached = _user_list_cache.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, orjson.dumps(build()))
+        _user_list_cache[key] = cached
+    return Response(content=cached[1], media_type="application/json")
+
+def _broker_users_listing() -> Dict[str, Any]:
+    """Frontend listing built with one pass over the table columns"""
+    return {
+        "success": True,
+        "users": [
+            {
+                "user_id": user_id,
+                "name": name,
+                "username": user_id,
+                "avatar": name[0].upper(),
+                "initial_capital": initial_capital,
+                "current_capital": current_capital,
+                "total_pnl": total_pnl,
+                "daily_pnl": daily_pnl,
+                "total_trades": total_trades,
+                "win_rate": win_rate,
+                "is_active": bool(is_active),
+                "open_trades": open_trades,
+                "paper_trading": bool(paper_trading)
+            }
+            for user_id, name, initial_capital, current_capital, total_pnl, daily_pnl,
+                total_trades, win_rate, is_active, open_trades, paper_trading in zip(*_LISTING_COLUMNS(broker_users))
+        ]
+    }
+
 @router.get("/users/broker")
 async def get_broker_users():
     """Get all broker users"""
     try:
-        # Convert to list format expected by frontend
-        users_list = list(broker_users.values())
-        
-        # Add mock data if no users exist
-        if not users_list:
-            # NO MOCK DATA - Real broker data required
-            return {
-                "success": True,
-                "users": []
-            }
-        
-        # Format users for frontend
-        formatted_users = []
-        for user in users_list:
-            formatted_users.append({
-                "user_id": user["user_id"],
-                "name": user["name"],
-                "username": user["user_id"],
-                "avatar": user["name"][0].upper(),
-                "initial_capital": user["initial_capital"],
-                "current_capital": user["current_capital"],
-                "total_pnl": user["total_pnl"],
-                "daily_pnl": user["daily_pnl"],
-                "total_trades": user["total_trades"],
-                "win_rate": user["win_rate"],
-                "is_active": user["is_active"],
-                "open_trades": user["open_trades"],
-                "paper_trading": user["paper_trading"]
-            })
+        # NO MOCK DATA - Real broker data required
+        if not broker_users:
+            return Response(content=_EMPTY_USERS_BODY, media_type="application/json")
         
-        return {
-            "success": True,
-            "users": formatted_users
-        }
+        # Format users for frontend (re-encoded only after a write)
+        return _cached_listing("broker", _broker_users_listing)
         
     except Exception as e:
-        logger.error(f"Error fetching broker users: {e}")
+        logger.error("Error fetching broker users: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/users/broker/{user_id}")
-async def update_broker_user(user_id: str, user: BrokerUser):
-    """Update an existing broker user"""
+async def update_broker_user(user_id: str, request: Request):
+    """Update an existing broker user (only the fields present in the body)"""
     try:
-        # Check if user exists
-        if user_id not in broker_users:
+        try:
+            user = _partial_broker_user_adapter.validate_json(await request.body())
+        except ValidationError as ve:
+            raise HTTPException(status_code=422, detail=ve.errors(include_url=False, include_input=False))
+        updates = user.model_dump(exclude_none=True)
+        
+        # Check if user exists (after the body is read, so the row can't vanish in between)
+        stored = broker_users.get(user_id)
+        if stored is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"User {user_id} not found"
             )
         
         # Update user data
-        broker_users[user_id].update({
-            "name": user.name,
-            "broker": user.broker,
-            "api_key": user.api_key,
-            "api_secret": user.api_secret,
-            "client_id": user.client_id,
-            "initial_capital": user.initial_capital,
-            "risk_tolerance": user.risk_tolerance,
-            "paper_trading": user.paper_trading,
-            "updated_at": datetime.now().isoformat()
-        })
-        
-        # Update environment variables
-        os.environ['SHAREKHAN_API_KEY'] = user.api_key
-        os.environ['SHAREKHAN_API_SECRET'] = user.api_secret
-        os.environ['SHAREKHAN_CLIENT_ID'] = user.client_id
-        os.environ['PAPER_TRADING'] = str(user.paper_trading).lower()
+        stored.update(updates, updated_at=now_iso())
         
-        logger.info(f"Updated broker user: {user_id} - Paper Trading: {user.paper_trading}")
+        logger.info("Updated broker user: %s - Fields: %s", user_id, sorted(updates))
         
         return {
             "success": True,
             "message": f"Broker user {user_id} updated successfully",
-            "user": broker_users[user_id]
+            "user": dict(stored)
         }
         
     except HTTPException as he:
-        logger.error(f"Validation error updating broker user: {he.detail}")
+        logger.error("Validation error updating broker user: %s", he.detail)
         raise
     except Exception as e:
-        logger.error(f"Error updating broker user: {e}")
+        logger.error("Error updating broker user: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/users/broker/{user_id}")
 async def delete_broker_user(user_id: str):
     """Delete a broker user"""
     try:
-        # Check if user exists
-        if user_id not in broker_users:
+        # Remove user (a missing user is a single failed probe)
+        deleted_user = broker_users.pop(user_id, None)
+        if deleted_user is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"User {user_id} not found"
             )
         
-        # Remove user
-        deleted_user = broker_users.pop(user_id)
-        
-        logger.info(f"Deleted broker user: {user_id}")
+        logger.info("Deleted broker user: %s", user_id)
         
         return {
             "success": True,
@@ -392,22 +606,23 @@ async def delete_broker_user(user_id: str):
         }
         
     except HTTPException as he:
-        logger.error(f"Error deleting broker user: {he.detail}")
+        logger.error("Error deleting broker user: %s", he.detail)
         raise
     except Exception as e:
-        logger.error(f"Error deleting broker user: {e}")
+        logger.error("Error deleting broker user: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/users/broker/initialize")
 async def initialize_users():
     """Manual endpoint to reinitialize default users (useful for testing)"""
     try:
-        success = initialize_default_users()
+        # Bypass the per-process cache so a deleted master account can be recreated
+        success = initialize_default_users.__wrapped__()
         if success:
             return {
                 "success": True,
                 "message": "Default users initialized successfully",
-                "users": list(broker_users.values())
+                "users": list_all_sharekhan_users()
             }
         else:
             return {
@@ -415,9 +630,55 @@ async def initialize_users():
                 "message": "Failed to initialize default users"
             }
     except Exception as e:
-        logger.error(f"Error in manual user initialization: {e}")
+        logger.error("Error in manual user initialization: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+# Registrations arriving within this window are applied together, deduplicated by user
+_REGISTER_BATCH_WINDOW = 0.05
+
+# sharekhan_user_id -> (latest profile, latest credentials, waiters)
+_pending_registrations: Dict[str, Tuple[Dict[str, Any], Dict[str, str], List[asyncio.Future]]] = {}
+_register_flush_task: Optional[asyncio.Task] = None
+
+async def _flush_registrations():
+    """Apply every registration queued during the batch window in one pass"""
+    global _register_flush_task
+    await asyncio.sleep(_REGISTER_BATCH_WINDOW)
+    batch = dict(_pending_registrations)
+    _pending_registrations.clear()
+    _register_flush_task = None
+    
+    for sharekhan_user_id, (user_profile, api_credentials, waiters) in batch.items():
+        try:
+            user_data = dict(create_or_update_sharekhan_user(
+                sharekhan_user_id=sharekhan_user_id,
+                user_profile=user_profile,
+                api_credentials=api_credentials
+            ))
+        except Exception as e:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+        else:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(user_data)
+    
+    logger.info("✅ Applied %s ShareKhan user registration(s)", len(batch))
+
+def _queue_registration(sharekhan_user_id: str, user_profile: Dict[str, Any], api_credentials: Dict[str, str]) -> asyncio.Future:
+    """Queue a registration for the next batch; the latest payload per user wins"""
+    global _register_flush_task
+    waiter = asyncio.get_running_loop().create_future()
+    pending = _pending_registrations.get(sharekhan_user_id)
+    waiters = pending[2] if pending is not None else []
+    waiters.append(waiter)
+    _pending_registrations[sharekhan_user_id] = (user_profile, api_credentials, waiters)
+    
+    if _register_flush_task is None:
+        _register_flush_task = asyncio.create_task(_flush_registrations())
+    return waiter
+
 @router.post("/users/sharekhan/register")
 async def register_sharekhan_user_dynamically(request: Dict[str, Any]):
     """
@@ -433,14 +694,10 @@ async def register_sharekhan_user_dynamically(request: Dict[str, Any]):
         user_profile = request.get('user_profile', {})
         api_credentials = request.get('api_credentials', {})
         
-        # Create or update the user
-        user_data = create_or_update_sharekhan_user(
-            sharekhan_user_id=sharekhan_user_id,
-            user_profile=user_profile,
-            api_credentials=api_credentials
-        )
+        # Create or update the user (micro-batched with concurrent registrations)
+        user_data = await _queue_registration(sharekhan_user_id, user_profile, api_credentials)
         
-        logger.info(f"✅ Successfully registered/updated ShareKhan user: {sharekhan_user_id}")
+        logger.info("✅ Successfully registered/updated ShareKhan user: %s", sharekhan_user_id)
         
         return {
             "success": True,
@@ -450,7 +707,7 @@ async def register_sharekhan_user_dynamically(request: Dict[str, Any]):
         }
         
     except Exception as e:
-        logger.error(f"❌ Error registering ShareKhan user: {e}")
+        logger.error("❌ Error registering ShareKhan user: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/users/sharekhan/{sharekhan_user_id}")
@@ -463,211 +720,267 @@ async def get_sharekhan_user_profile(sharekhan_user_id: str):
         
         return {
             "success": True,
-            "user": user_data
+            "user": dict(user_data)
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error getting user profile: {e}")
+        logger.error("❌ Error getting user profile: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sharekhan_users_listing() -> Dict[str, Any]:
+    all_users = list_all_sharekhan_users()
+    master_user = get_master_user()
+    return {
+        "success": True,
+        "users": all_users,
+        "total_users": len(all_users),
+        "master_user": dict(master_user) if master_user else None
+    }
+
 @router.get("/users/sharekhan")
 async def list_sharekhan_users():
     """List all registered ShareKhan users with their analytics"""
     try:
-        all_users = list_all_sharekhan_users()
-        
-        return {
-            "success": True,
-            "users": all_users,
-            "total_users": len(all_users),
-            "master_user": get_master_user()
-        }
+        return _cached_listing("sharekhan", _sharekhan_users_listing)
         
     except Exception as e:
-        logger.error(f"❌ Error listing ShareKhan users: {e}")
+        logger.error("❌ Error listing ShareKhan users: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@lru_cache(maxsize=1)
+def _get_orchestrator_cls():
+    """Import trading components once, outside the repeated request path"""
+    from src.core.orchestrator import TradingOrchestrator
+    # Fail fast if the ShareKhan data client is unavailable
+    from data.sharekhan_client import (
+        initialize_sharekhan,
+        get_sharekhan_status,
+        is_connected,
+        live_market_data,
+        sharekhan_connection_status
+    )
+    return TradingOrchestrator
+
+async def _start_trading() -> Dict[str, Any]:
+    """Start the trading system"""
+    if trading_state["is_running"]:
+        return {
+            "success": False,
+            "message": "Trading is already running",
+            "status": "running"
+        }
+    
+    # Check if we have at least one user
+    if not broker_users:
+        return {
+            "success": False,
+            "message": "No broker users configured. Please add a user first.",
+            "status": "no_users"
+        }
+    
+    # Start trading components
+    logger.info("Starting trading system...")
+    
+    # Import and initialize components (resolved once per process)
+    TradingOrchestrator = _get_orchestrator_cls()
+    
+    # Trading config is prebuilt from the cached environment
+    config = _TRADING_CONFIG
+    
+    # Initialize orchestrator (singleton)
+    trading_state["orchestrator"] = TradingOrchestrator.get_instance()
+    
+    # Enable trading
+    await trading_state["orchestrator"].enable_trading()
+    
+    trading_state["is_running"] = True
+    trading_state["start_time"] = now_iso()
+    
+    logger.info("Trading started - ShareKhan API will handle paper/live mode automatically")
+    
+    return {
+        "success": True,
+        "message": f"Trading started successfully - ShareKhan API will handle paper/live mode automatically",
+        "status": "running",
+        "start_time": trading_state["start_time"]
+    }
+
+async def _stop_trading() -> Dict[str, Any]:
+    """Stop the trading system"""
+    if not trading_state["is_running"]:
+        return {
+            "success": False,
+            "message": "Trading is not running",
+            "status": "stopped"
+        }
+    
+    # Stop trading
+    logger.info("Stopping trading system...")
+    
+    if trading_state["orchestrator"]:
+        await trading_state["orchestrator"].disable_trading()
+        trading_state["orchestrator"] = None
+    
+    trading_state["is_running"] = False
+    trading_state["start_time"] = None
+    
+    logger.info("Trading stopped")
+    
+    return {
+        "success": True,
+        "message": "Trading stopped successfully",
+        "status": "stopped"
+    }
+
+async def _trading_control_status() -> Dict[str, Any]:
+    """Report whether trading is running"""
+    return {
+        "success": True,
+        "status": "running" if trading_state["is_running"] else "stopped",
+        "paper_trading": trading_state["paper_trading"],
+        "start_time": trading_state["start_time"],
+        "users_count": len(broker_users)
+    }
+
+_ACTION_DISPATCH = {
+    "start": _start_trading,
+    "stop": _stop_trading,
+    "status": _trading_control_status
+}
+
 @router.post("/trading/control")
 async def control_trading(command: TradingCommand):
     """Control trading operations - start, stop, pause, resume"""
     try:
-        global trading_state
-        
-        if command.action == "start":
-            if trading_state["is_running"]:
-                return {
-                    "success": False,
-                    "message": "Trading is already running",
-                    "status": "running"
-                }
-            
-            # Check if we have at least one user
-            if not broker_users:
-                return {
-                    "success": False,
-                    "message": "No broker users configured. Please add a user first.",
-                    "status": "no_users"
-                }
-            
-            # Start trading components
-            logger.info("Starting trading system...")
-            
-            # Import and initialize components
-            from src.core.orchestrator import TradingOrchestrator
-            from data.sharekhan_client import (
-                initialize_sharekhan,
-                get_sharekhan_status, 
-                is_connected,
-                live_market_data,
-                sharekhan_connection_status
-            )
-            
-            # Create config
-            config = {
-                'redis': {
-                    'host': os.getenv('REDIS_HOST', 'localhost'),
-                    'port': int(os.getenv('REDIS_PORT', 6379)),
-                    'password': os.getenv('REDIS_PASSWORD'),
-                    'ssl': os.getenv('REDIS_SSL', 'false').lower() == 'true'
-                },
-                'broker': {
-                    'api_key': os.getenv('SHAREKHAN_API_KEY'),
-                    'api_secret': os.getenv('SHAREKHAN_API_SECRET'),
-                    'client_id': os.getenv('SHAREKHAN_CLIENT_ID')
-                },
-                'data_provider': {
-                                    'username': os.getenv('SHAREKHAN_USERNAME', 'tdwsp697'),
-                'password': os.getenv('SHAREKHAN_PASSWORD', 'shyam@697'),
-                    'url': os.getenv('SHAREKHAN_URL', 'push.sharekhan.in'),
-                    'port': int(os.getenv('SHAREKHAN_PORT', 8084))
-                },
-                'strategies': {
-                    'volatility_explosion': {'enabled': True},
-                    'momentum_surfer': {'enabled': True},
-                    'volume_profile_scalper': {'enabled': True},
-                    'news_impact_scalper': {'enabled': True}
-                }
-            }
-            
-            # Initialize orchestrator (singleton)
-            trading_state["orchestrator"] = TradingOrchestrator.get_instance()
-            
-            # Enable trading
-            await trading_state["orchestrator"].enable_trading()
-            
-            trading_state["is_running"] = True
-            trading_state["start_time"] = datetime.now().isoformat()
-            
-            logger.info(f"Trading started - ShareKhan API will handle paper/live mode automatically")
-            
-            return {
-                "success": True,
-                "message": f"Trading started successfully - ShareKhan API will handle paper/live mode automatically",
-                "status": "running",
-                "start_time": trading_state["start_time"]
-            }
-            
-        elif command.action == "stop":
-            if not trading_state["is_running"]:
-                return {
-                    "success": False,
-                    "message": "Trading is not running",
-                    "status": "stopped"
-                }
-            
-            # Stop trading
-            logger.info("Stopping trading system...")
-            
-            if trading_state["orchestrator"]:
-                await trading_state["orchestrator"].disable_trading()
-                trading_state["orchestrator"] = None
-            
-            trading_state["is_running"] = False
-            trading_state["start_time"] = None
-            
-            logger.info("Trading stopped")
-            
-            return {
-                "success": True,
-                "message": "Trading stopped successfully",
-                "status": "stopped"
-            }
-            
-        elif command.action == "status":
-            return {
-                "success": True,
-                "status": "running" if trading_state["is_running"] else "stopped",
-                "paper_trading": trading_state["paper_trading"],
-                "start_time": trading_state["start_time"],
-                "users_count": len(broker_users)
-            }
-            
-        else:
+        handler = _ACTION_DISPATCH.get(command.action)
+        if handler is None:
             raise HTTPException(status_code=400, detail=f"Invalid action: {command.action}")
+        return await handler()
             
     except Exception as e:
-        logger.error(f"Error controlling trading: {e}")
+        logger.error("Error controlling trading: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+def _trading_status_payload() -> Dict[str, Any]:
+    """Current trading system status, shared by the router and the ASGI fast path"""
+    return {
+        "success": True,
+        "is_running": trading_state["is_running"],
+        "paper_trading": trading_state["paper_trading"],
+        "start_time": trading_state["start_time"],
+        "users_count": len(broker_users),
+        "autonomous_trading": trading_state["is_running"],
+        "status": "running" if trading_state["is_running"] else "stopped"
+    }
+
+def _sharekhan_manual_status_payload(user_id: str) -> Dict[str, Any]:
+    """ShareKhan manual authentication status, shared by the router and the ASGI fast path"""
+    return {
+        "success": True,
+        "message": "ShareKhan manual auth ready - awaiting ShareKhan completion",
+        "authenticated": False,
+        "user_id": user_id,
+        "note": "System ready for manual token submission when needed",
+        "priority": "ShareKhan first, ShareKhan second (as planned)"
+    }
+
+class StatusASGI:
+    """
+    Pure ASGI app for high-frequency status polling.
+    Skips FastAPI request/response construction and dependency resolution;
+    the router endpoints remain available for compatibility.
+    """
+    
+    _JSON_HEADERS = [(b"content-type", b"application/json")]
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        
+        path = scope["path"]
+        if scope["method"] != "GET":
+            status_code, body = 405, b'{"detail":"Method Not Allowed"}'
+        elif path == "/trading/status":
+            status_code, body = 200, orjson.dumps(_trading_status_payload())
+        elif path == "/sharekhan-manual/status":
+            user_id = parse_qs(scope["query_string"].decode()).get("user_id", ["SHAREKHAN_DEFAULT"])[0]
+            status_code, body = 200, orjson.dumps(_sharekhan_manual_status_payload(user_id))
+        else:
+            status_code, body = 404, b'{"detail":"Not Found"}'
+        
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": self._JSON_HEADERS + [(b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
+
 @router.get("/trading/status")
 async def get_trading_status():
     """Get current trading system status"""
     try:
-        return {
-            "success": True,
-            "is_running": trading_state["is_running"],
-            "paper_trading": trading_state["paper_trading"],
-            "start_time": trading_state["start_time"],
-            "users_count": len(broker_users),
-            "autonomous_trading": trading_state["is_running"],
-            "status": "running" if trading_state["is_running"] else "stopped"
-        }
+        return _trading_status_payload()
     except Exception as e:
-        logger.error(f"Error getting trading status: {e}")
+        logger.error("Error getting trading status: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+_MANUAL_AUTH_INSTRUCTIONS = (
+    "1. Click the authorization URL",
+    "2. Login to ShareKhan with your credentials",
+    "3. After login, you'll be redirected to a URL",
+    "4. Copy the 'request_token' parameter from the redirected URL",
+    "5. Paste the token in the manual token entry"
+)
+
+# (api_key, encoded body) of the last auth-url response; rebuilt only when the key changes
+_auth_url_response: List[Any] = [None, b""]
+
+def _auth_url_response_bytes() -> bytes:
+    api_key = _ENV.api_key  # Use actual production key
+    if _auth_url_response[0] != api_key or not _auth_url_response[1]:
+        _auth_url_response[:] = [api_key, orjson.dumps({
+            "success": True,
+            "auth_url": f"https://newtrade.sharekhan.com/api/login?api_key={api_key}",
+            "instructions": _MANUAL_AUTH_INSTRUCTIONS,
+            "example_redirect": "https://yourapp.com/callback?request_token=YOUR_TOKEN_HERE&action=login&status=success",
+            "note": "Extract only the request_token value, not the full URL",
+            "status": "Ready for use after ShareKhan testing complete"
+        })]
+    return _auth_url_response[1]
+
+_SHAREKHAN_MANUAL_TEST_RESPONSE = {
+    "success": True,
+    "message": "ShareKhan manual authentication system ready",
+    "version": "1.0.0",
+    "status": "Standby - awaiting ShareKhan completion",
+    "endpoints": (
+        "/api/v1/control/sharekhan-manual/auth-url",
+        "/api/v1/control/sharekhan-manual/status",
+        "/api/v1/control/sharekhan-manual/submit-token",
+        "/api/v1/control/sharekhan-manual/test"
+    ),
+    "workflow": "ShareKhan → Complete Testing → ShareKhan Authorization → Trading Ready"
+}
+
 # Add ShareKhan Manual Authentication endpoints to existing working router
 @router.get("/sharekhan-manual/auth-url")
 async def get_sharekhan_manual_auth_url():
     """Get ShareKhan authorization URL for manual token extraction"""
     try:
-        api_key = os.getenv('SHAREKHAN_API_KEY')  # Use actual production key
-        auth_url = f"https://newtrade.sharekhan.com/api/login?api_key={api_key}"
-        
-        return {
-            "success": True,
-            "auth_url": auth_url,
-            "instructions": [
-                "1. Click the authorization URL",
-                "2. Login to ShareKhan with your credentials", 
-                "3. After login, you'll be redirected to a URL",
-                "4. Copy the 'request_token' parameter from the redirected URL",
-                "5. Paste the token in the manual token entry"
-            ],
-            "example_redirect": "https://yourapp.com/callback?request_token=YOUR_TOKEN_HERE&action=login&status=success",
-            "note": "Extract only the request_token value, not the full URL",
-            "status": "Ready for use after ShareKhan testing complete"
-        }
+        return Response(content=_auth_url_response_bytes(), media_type="application/json")
     except Exception as e:
-        logger.error(f"Failed to generate ShareKhan auth URL: {e}")
+        logger.error("Failed to generate ShareKhan auth URL: %s", e)
         return {"success": False, "error": str(e)}
 
 @router.get("/sharekhan-manual/status")
 async def get_sharekhan_manual_status(user_id: str = "SHAREKHAN_DEFAULT"):
     """Get current ShareKhan manual authentication status"""
     try:
-        return {
-            "success": True,
-            "message": "ShareKhan manual auth ready - awaiting ShareKhan completion",
-            "authenticated": False,
-            "user_id": user_id,
-            "note": "System ready for manual token submission when needed",
-            "priority": "ShareKhan first, ShareKhan second (as planned)"
-        }
+        return _sharekhan_manual_status_payload(user_id)
     except Exception as e:
-        logger.error(f"ShareKhan manual status check failed: {e}")
+        logger.error("ShareKhan manual status check failed: %s", e)
         return {
             "success": False,
             "message": f"Status check failed: {str(e)}",
@@ -700,23 +1013,10 @@ async def submit_sharekhan_manual_token(request: dict):
         }
         
     except Exception as e:
-        logger.error(f"ShareKhan manual token submission failed: {e}")
+        logger.error("ShareKhan manual token submission failed: %s", e)
         return {"success": False, "error": str(e)}
 
 @router.get("/sharekhan-manual/test")
 async def test_sharekhan_manual_system():
     """Test ShareKhan manual auth system readiness"""
-    return {
-        "success": True,
-        "message": "ShareKhan manual authentication system ready",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0",
-        "status": "Standby - awaiting ShareKhan completion",
-        "endpoints": [
-            "/api/v1/control/sharekhan-manual/auth-url",
-            "/api/v1/control/sharekhan-manual/status", 
-            "/api/v1/control/sharekhan-manual/submit-token",
-            "/api/v1/control/sharekhan-manual/test"
-        ],
-        "workflow": "ShareKhan → Complete Testing → ShareKhan Authorization → Trading Ready"
-    } 
\ No newline at end of file
+    return _SHAREKHAN_MANUAL_TEST_RESPONSE | {"timestamp": now_iso()}
@@ -2,47 +2,36 @@
 ShareKhan Integration API Endpoints
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, WebSocket, WebSocketDisconnect
+from pydantic import TypeAdapter, ValidationError
 from typing import List, Dict, Optional
 import logging
-from datetime import datetime
 import asyncio
-from fastapi.responses import JSONResponse
-import sys
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+import orjson
+import time
+from itertools import islice
+from collections import defaultdict
+from functools import lru_cache
 import os
+import zlib
+
+from src.utils.clock import now_iso
 
 # Define logger early to avoid undefined errors
 logger = logging.getLogger(__name__)
 
-from data.sharekhan_client import (
-    sharekhan_client, 
-    live_market_data, 
-    initialize_sharekhan,
-    get_live_data_for_symbol,
-    get_sharekhan_status
-)
-
-# CRITICAL FIX: Direct bridge to populated ShareKhan cache at module level
-sys.path.insert(0, os.path.abspath('.'))
-
-try:
-    from data.sharekhan_client import live_market_data as sharekhan_cache_direct
-    from data.sharekhan_client import sharekhan_client as sharekhan_client_direct
-    DIRECT_BRIDGE_AVAILABLE = True
-    logger.info("✅ ShareKhan direct bridge established in integration API")
-except ImportError as e:
-    logger.error(f"❌ ShareKhan direct bridge failed in integration API: {e}")
-    sharekhan_cache_direct = {}
-    DIRECT_BRIDGE_AVAILABLE = False
+# Single module reference; handlers read attributes instead of re-importing per request
+import data.sharekhan_client as _sk
 
 def smart_auto_retry():
     """Smart autonomous retry for ShareKhan - FIXED to check cache instead of connecting"""
     try:
         # FIXED: Check cache availability instead of trying to connect
-        from data.sharekhan_client import live_market_data, is_connected
         
-        if len(live_market_data) > 0:
-            logger.info(f"✅ AUTONOMOUS: ShareKhan cache available: {len(live_market_data)} symbols")
+        symbol_count = len(_sk.live_market_data)
+        if symbol_count:
+            logger.info(f"✅ AUTONOMOUS: ShareKhan cache available: {symbol_count} symbols")
             return True
         else:
             logger.warning("⚠️ AUTONOMOUS: ShareKhan cache is empty")
@@ -52,9 +41,35 @@ def smart_auto_retry():
         logger.error(f"Auto-retry cache check error: {e}")
         return False
         
-from src.models.responses import ShareKhanResponse, APIResponse
 
-router = APIRouter(prefix="/sharekhan", tags=["sharekhan"])
+router = APIRouter(prefix="/sharekhan", tags=["sharekhan"], default_response_class=ORJSONResponse)
+
+def _api_response(success: bool, message: str, data: Optional[Dict] = None) -> Dict:
+    """APIResponse-shaped dict for trusted in-process data (skips Pydantic validation)"""
+    return {
+        "success": success,
+        "message": message,
+        "data": data,
+        "timestamp": now_iso()
+    }
+
+def _api_response_head(success: bool, message: str, data: Optional[Dict] = None) -> bytes:
+    """Encoded _api_response minus its timestamp and closing brace, for caching across requests"""
+    return orjson.dumps({"success": success, "message": message, "data": data})[:-1]
+
+def _finish_api_response(head: bytes) -> Response:
+    """Complete a cached _api_response_head with this request's timestamp"""
+    return Response(content=head + b',"timestamp":' + orjson.dumps(now_iso()) + b'}',
+                    media_type="application/json")
+
+# Encoded /data payload head shared by all pollers: (bytes, monotonic ts, symbol count, tick version).
+# notify_tick() retires it at once; the short TTL bounds staleness for writers that never notify.
+_SNAPSHOT_TTL = 0.5
+_cached_snapshot: Optional[tuple] = None
+_tick_version = 0  # Bumped by every notify_tick()
+
+# Encoded /data/{symbol} response heads, rebuilt only when that symbol's tick changes: (tick snapshot, bytes)
+_symbol_body_cache: Dict[str, tuple] = {}
 
 @router.post("/connect")
 async def connect_sharekhan(credentials: Dict):
@@ -67,15 +82,15 @@ async def connect_sharekhan(credentials: Dict):
             raise HTTPException(status_code=400, detail="Username and password required")
         
         # FIXED: Check existing ShareKhan cache instead of trying to connect
-        from data.sharekhan_client import live_market_data, is_connected
         
-        if len(live_market_data) > 0:
+        symbol_count = len(_sk.live_market_data)
+        if symbol_count:
             return {
                 "success": True,
-                "message": f"ShareKhan cache available: {len(live_market_data)} symbols",
-                "cache_size": len(live_market_data),
+                "message": f"ShareKhan cache available: {symbol_count} symbols",
+                "cache_size": symbol_count,
                 "note": "Using existing ShareKhan connection - no new connection needed",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
         else:
             raise HTTPException(status_code=503, detail="ShareKhan cache is empty - main connection required")
@@ -86,11 +101,21 @@ async def connect_sharekhan(credentials: Dict):
         logger.error(f"Error checking ShareKhan cache: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Symbol lists are parsed straight from the raw body in one pass
+_symbols_adapter = TypeAdapter(List[str])
+
+async def _read_symbols(request: Request) -> List[str]:
+    try:
+        return _symbols_adapter.validate_json(await request.body())
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=ve.errors(include_url=False, include_input=False))
+
 @router.post("/subscribe")
-async def subscribe_symbols(symbols: List[str]):
+async def subscribe_symbols(request: Request):
     """Subscribe to symbols for live data"""
+    symbols = await _read_symbols(request)
     try:
-        if not sharekhan_client.connected:
+        if not _sk.sharekhan_client.connected:
             raise HTTPException(status_code=503, detail="ShareKhan client not connected")
         
         # ShareKhan subscription is handled during connection
@@ -99,7 +124,7 @@ async def subscribe_symbols(symbols: List[str]):
             "success": True,
             "message": f"ShareKhan handles symbol subscription automatically",
             "symbols": symbols,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
             
     except HTTPException:
@@ -109,21 +134,25 @@ async def subscribe_symbols(symbols: List[str]):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/unsubscribe")
-async def unsubscribe_symbols(symbols: List[str]):
+async def unsubscribe_symbols(request: Request):
     """Unsubscribe from symbols"""
+    symbols = await _read_symbols(request)
     try:
-        if not sharekhan_client.connected:
+        if not _sk.sharekhan_client.connected:
             raise HTTPException(status_code=503, detail="ShareKhan client not connected")
         
         # For now, just remove from live data (ShareKhan SDK doesn't have unsubscribe)
-        for symbol in symbols:
-            live_market_data.pop(symbol, None)
+        for symbol in _sk.live_market_data.keys() & set(symbols):
+            _sk.live_market_data.pop(symbol, None)
+            _symbol_body_cache.pop(symbol, None)
+            _last_serialized.pop(symbol, None)
+            notify_tick(symbol)
         
         return {
             "success": True,
             "message": f"Unsubscribed from {len(symbols)} symbols",
             "symbols": symbols,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
             
     except HTTPException:
@@ -132,22 +161,40 @@ async def unsubscribe_symbols(symbols: List[str]):
         logger.error(f"Error unsubscribing from symbols: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Status endpoints are polled; let clients reuse a response briefly and revalidate by ETag
+_STATUS_CACHE_CONTROL = "private, max-age=5"
+
+def _status_etag(state) -> str:
+    """Weak ETag over the connection state a status payload is built from (timestamps excluded)"""
+    return f'W/"{zlib.crc32(orjson.dumps(state, option=orjson.OPT_SORT_KEYS, default=str)):08x}"'
+
+def _not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """304 when the client already holds this state; otherwise tag the outgoing response"""
+    headers = {"ETag": etag, "Cache-Control": _STATUS_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
 @router.get("/status")
-async def get_sharekhan_status_endpoint():
+async def get_sharekhan_status_endpoint(request: Request, response: Response):
     """Get ShareKhan connection status"""
     try:
-        if not sharekhan_client:
+        if not _sk.sharekhan_client:
             return {
                 "connected": False,
                 "message": "ShareKhan client not initialized",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
         
-        status = get_sharekhan_status()
+        status = _sk.get_sharekhan_status()
+        not_modified = _not_modified(request, response, _status_etag(status))
+        if not_modified is not None:
+            return not_modified
         return {
             "success": True,
             "data": status,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
         
     except Exception as e:
@@ -159,25 +206,25 @@ async def reconnect_sharekhan():
     """Attempt to reconnect to ShareKhan - FIXED to check cache instead of connecting"""
     try:
         # FIXED: Check cache availability instead of trying to reconnect
-        from data.sharekhan_client import live_market_data, get_sharekhan_status
         
-        status = get_sharekhan_status()
+        status = _sk.get_sharekhan_status()
         
-        if len(live_market_data) > 0:
+        symbol_count = len(_sk.live_market_data)
+        if symbol_count:
             return {
                 "success": True,
-                "message": f"ShareKhan cache available: {len(live_market_data)} symbols",
-                "cache_size": len(live_market_data),
+                "message": f"ShareKhan cache available: {symbol_count} symbols",
+                "cache_size": symbol_count,
                 "note": "Using existing ShareKhan connection - no reconnection needed",
                 "data": status,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
         else:
             return {
                 "success": False,
                 "message": "ShareKhan cache is empty - main app connection required",
                 "data": status,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
             
     except Exception as e:
@@ -188,19 +235,22 @@ async def reconnect_sharekhan():
 async def get_symbol_data(symbol: str):
     """Get latest market data for a specific symbol"""
     try:
-        if not sharekhan_client.connected:
+        if not _sk.sharekhan_client.connected:
             raise HTTPException(status_code=503, detail="ShareKhan client not connected")
         
-        data = get_live_data_for_symbol(symbol)
+        data = _sk.get_live_data_for_symbol(symbol)
         
         if data:
-            return ShareKhanResponse.create_symbol_data(symbol, data).dict()
+            cached = _symbol_body_cache.get(symbol)
+            if cached is None or cached[0] != data:
+                cached = (dict(data), _api_response_head(True, f"Data retrieved for {symbol}", {
+                    "symbol": symbol,
+                    "market_data": data
+                }))
+                _symbol_body_cache[symbol] = cached
+            return _finish_api_response(cached[1])
         else:
-            return APIResponse(
-                success=False,
-                message=f"No data available for symbol {symbol}",
-                data={"symbol": symbol}
-            ).dict()
+            return _api_response(False, f"No data available for symbol {symbol}", {"symbol": symbol})
             
     except HTTPException:
         raise
@@ -212,17 +262,24 @@ async def get_symbol_data(symbol: str):
 async def get_all_market_data():
     """Get all market data"""
     try:
-        if not sharekhan_client.connected:
+        if not _sk.sharekhan_client.connected:
             raise HTTPException(status_code=503, detail="ShareKhan client not connected")
         
-        return APIResponse(
-            success=True,
-            message="All market data retrieved successfully",
-            data={
-                "market_data": live_market_data,
-                "total_symbols": len(live_market_data)
-            }
-        ).dict()
+        global _cached_snapshot
+        now = time.monotonic()
+        symbol_count = len(_sk.live_market_data)
+        version = _tick_version
+        cached = _cached_snapshot
+        if (cached is not None and cached[2] == symbol_count and cached[3] == version
+                and now - cached[1] < _SNAPSHOT_TTL):
+            return _finish_api_response(cached[0])
+        
+        head = _api_response_head(True, "All market data retrieved successfully", {
+            "market_data": _sk.live_market_data,
+            "total_symbols": symbol_count
+        })
+        _cached_snapshot = (head, now, symbol_count, version)
+        return _finish_api_response(head)
         
     except HTTPException:
         raise
@@ -234,16 +291,14 @@ async def get_all_market_data():
 async def disconnect_sharekhan():
     """Disconnect from ShareKhan"""
     try:
-        if not sharekhan_client.connected:
+        if not _sk.sharekhan_client.connected:
             raise HTTPException(status_code=503, detail="ShareKhan client not connected")
         
-        sharekhan_client.disconnect()
+        _sk.sharekhan_client.disconnect()
         
-        return APIResponse(
-            success=True,
-            message="ShareKhan disconnected successfully",
-            data={"disconnected_at": datetime.now().isoformat()}
-        ).dict()
+        return _api_response(True, "ShareKhan disconnected successfully", {
+            "disconnected_at": now_iso()
+        })
         
     except HTTPException:
         raise
@@ -251,99 +306,230 @@ async def disconnect_sharekhan():
         logger.error(f"Error disconnecting from ShareKhan: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# WebSocket streams wait on a per-symbol event instead of polling; the feed calls notify_tick()
+_TICK_WAIT_TIMEOUT = 1.0
+_TICK_COALESCE_WINDOW = 0.01
+_symbol_events: Dict[str, asyncio.Event] = defaultdict(asyncio.Event)
+_tick_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _set_tick_events(symbol: Optional[str]):
+    if symbol is None:
+        for event in _symbol_events.values():
+            event.set()
+    else:
+        event = _symbol_events.get(symbol)
+        if event is not None:
+            event.set()
+
+def notify_tick(symbol: Optional[str] = None):
+    """Wake streams for a symbol (all symbols if None) after live_market_data changes; safe from the feed thread"""
+    global _tick_version
+    _tick_version += 1
+    loop = _tick_loop
+    if loop is not None and not loop.is_closed():
+        loop.call_soon_threadsafe(_set_tick_events, symbol)
+
+async def _wait_for_tick(symbol: str):
+    """Block until the symbol is notified, or the fallback timeout for feeds that never notify"""
+    event = _symbol_events[symbol]
+    try:
+        await asyncio.wait_for(event.wait(), timeout=_TICK_WAIT_TIMEOUT)
+    except asyncio.TimeoutError:
+        return
+    event.clear()
+    # Let a burst of ticks land so it goes out as one frame instead of one send per tick
+    await asyncio.sleep(_TICK_COALESCE_WINDOW)
+
+# Latest encoded tick per symbol, shared by every stream on it: (tick snapshot, data json, market_data frame)
+_last_serialized: Dict[str, tuple] = {}
+
+@lru_cache(maxsize=1024)
+def _frame_prefix(frame_type: str, symbol: str) -> str:
+    """Constant head of a symbol's frame, up to the data value"""
+    return '{"type":"' + frame_type + '","symbol":' + orjson.dumps(symbol).decode() + ',"data":'
+
+def _serialized_tick(symbol: str, data: Dict) -> tuple:
+    """Encode a tick once; later callers with the same tick reuse it"""
+    cached = _last_serialized.get(symbol)
+    if cached is not None and cached[0] == data:
+        return cached
+    # Only the tick itself is encoded; the envelope keys are spliced in as text.
+    # The frame carries the tick's own timestamp when it has one.
+    data_json = orjson.dumps(data).decode()
+    timestamp = orjson.dumps(data.get('timestamp') or now_iso()).decode()
+    frame = _frame_prefix("market_data", symbol) + data_json + ',"timestamp":' + timestamp + '}'
+    cached = _last_serialized[symbol] = (dict(data), data_json, frame)
+    return cached
+
+def _market_data_frame(symbol: str, data: Dict) -> str:
+    return _serialized_tick(symbol, data)[2]
+
+# Per-connection outbound buffer; a slow client loses stale frames instead of stalling the feed
+_WS_QUEUE_SIZE = 64
+
+def _offer_frame(queue: asyncio.Queue, frame: str):
+    """Enqueue without blocking the producer, dropping the oldest frame when full"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(frame)
+
+# One publisher task per watched symbol fans each changed frame out to its subscribers' queues
+_symbol_subscribers: Dict[str, set] = defaultdict(set)
+_symbol_publishers: Dict[str, asyncio.Task] = {}
+_FANOUT_YIELD_EVERY = 50
+
+async def _publish_symbol(symbol: str):
+    """Read the symbol once per tick and queue the shared frame for every subscriber"""
+    # Start from the tick the first subscriber just received as initial_data
+    cached = _last_serialized.get(symbol)
+    last_frame = cached[2] if cached else None
+    while True:
+        await _wait_for_tick(symbol)
+        try:
+            data = _sk.get_live_data_for_symbol(symbol)
+            if data:
+                frame = _market_data_frame(symbol, data)
+                if frame is not last_frame:
+                    # Hand the loop back every _FANOUT_YIELD_EVERY queues so a large
+                    # fan-out cannot starve HTTP handlers; small ones finish in one pass
+                    for i, queue in enumerate(tuple(_symbol_subscribers[symbol]), 1):
+                        _offer_frame(queue, frame)
+                        if i % _FANOUT_YIELD_EVERY == 0:
+                            await asyncio.sleep(0)
+                    last_frame = frame
+        except Exception as e:
+            logger.error(f"Tick publisher error for {symbol}: {e}")
+
+def _subscribe(symbol: str, queue: asyncio.Queue):
+    _symbol_subscribers[symbol].add(queue)
+    if symbol not in _symbol_publishers:
+        _symbol_publishers[symbol] = asyncio.create_task(_publish_symbol(symbol))
+
+def _unsubscribe(symbol: str, queue: asyncio.Queue):
+    """Drop a subscriber; the last one out stops the symbol's publisher"""
+    subscribers = _symbol_subscribers.get(symbol)
+    if subscribers is None:
+        return
+    subscribers.discard(queue)
+    if not subscribers:
+        del _symbol_subscribers[symbol]
+        _symbol_events.pop(symbol, None)
+        publisher = _symbol_publishers.pop(symbol, None)
+        if publisher is not None:
+            publisher.cancel()
+
+async def _send_frames(websocket: WebSocket, queue: asyncio.Queue):
+    while True:
+        await websocket.send_text(await queue.get())
+
+async def _receive_until_disconnect(websocket: WebSocket):
+    """Discard client messages and raise once the client goes away.
+
+    Frames are only sent when a tick changes, so on a quiet symbol the sender
+    alone would not notice a closed connection.
+    """
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+
 # WebSocket integration for real-time data
 @router.websocket("/ws/{symbol}")
-async def sharekhan_websocket(websocket, symbol: str):
+async def sharekhan_websocket(websocket: WebSocket, symbol: str):
     """WebSocket endpoint for real-time ShareKhan"""
     try:
-        if not sharekhan_client.connected:
+        if not _sk.sharekhan_client.connected:
             await websocket.close(code=1011, reason="ShareKhan client not connected")
             return
         
         # Subscribe to symbol if not already subscribed
-        if symbol not in live_market_data:
+        if symbol not in _sk.live_market_data:
             # CRITICAL FIX: Don't call subscribe_to_symbols() - creates connection conflicts
             # Instead, just log that symbol subscription was requested
             logger.info(f"📝 SYMBOL SUBSCRIPTION REQUESTED: {symbol} - will be available via main ShareKhan client")
         
+        global _tick_loop
+        _tick_loop = asyncio.get_running_loop()
+        await websocket.accept()
+        
+        out_q: asyncio.Queue = asyncio.Queue(maxsize=_WS_QUEUE_SIZE)
+        
         # Send initial data
-        initial_data = get_live_data_for_symbol(symbol)
+        initial_data = _sk.get_live_data_for_symbol(symbol)
         if initial_data:
-            await websocket.send_json({
-                "type": "initial_data",
-                "symbol": symbol,
-                "data": initial_data
-            })
+            data_json = _serialized_tick(symbol, initial_data)[1]
+            _offer_frame(out_q, _frame_prefix("initial_data", symbol) + data_json + '}')
         
-        # Keep connection alive and send updates
-        while True:
-            # Get latest data
-            data = get_live_data_for_symbol(symbol)
-            if data:
-                await websocket.send_json({
-                    "type": "market_data",
-                    "symbol": symbol,
-                    "data": data,
-                    "timestamp": datetime.now().isoformat()
-                })
-            
-            # Wait before next update
-            await asyncio.sleep(1)
+        # The symbol's publisher fills the queue; this connection drains it at the client's pace
+        _subscribe(symbol, out_q)
+        sender = asyncio.create_task(_send_frames(websocket, out_q))
+        receiver = asyncio.create_task(_receive_until_disconnect(websocket))
+        try:
+            done, _ = await asyncio.wait((sender, receiver), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        finally:
+            sender.cancel()
+            receiver.cancel()
+            _unsubscribe(symbol, out_q)
             
+    except WebSocketDisconnect:
+        logger.info(f"WebSocket client disconnected from {symbol}")
     except Exception as e:
         logger.error(f"WebSocket error for symbol {symbol}: {e}")
         await websocket.close(code=1011, reason="Internal error")
 
+def _resolve_debug_client():
+    """Pick the client debug_client_internals reports on, once at import"""
+    if hasattr(_sk, 'sharekhan_connection_status'):
+        return ("singleton", None)
+    try:
+        from src.data.sharekhan_client import get_sharekhan_client
+        return ("async", get_sharekhan_client)
+    except ImportError:
+        return None
+
+_DEBUG_CLIENT_REF = _resolve_debug_client()
+
 @router.get("/debug/client-internals")
 async def debug_client_internals():
     """Debug ShareKhan client internals"""
     try:
-        # Try both client paths
-        client = None
-        client_type = "unknown"
+        if _DEBUG_CLIENT_REF is None:
+            return {
+                "success": False,
+                "error": "No ShareKhan client found"
+            }
         
-        try:
-            from data.sharekhan_client import sharekhan_client, live_market_data, sharekhan_connection_status
-            client = sharekhan_client
-            client_type = "singleton"
-            
+        client_type, get_client = _DEBUG_CLIENT_REF
+        if client_type == "singleton":
+            client = _sk.sharekhan_client
             return {
                 "success": True,
                 "client_type": client_type,
                 "client_status": client.get_status() if hasattr(client, 'get_status') else "no_status_method",
-                "live_data_count": len(live_market_data),
-                "live_data_keys": list(live_market_data.keys()),
-                "connection_status": sharekhan_connection_status,
-                "sample_data": dict(list(live_market_data.items())[:3]) if live_market_data else {}
+                "live_data_count": len(_sk.live_market_data),
+                "live_data_keys": list(_sk.live_market_data),
+                "connection_status": _sk.sharekhan_connection_status,
+                "sample_data": dict(islice(_sk.live_market_data.items(), 3))
+            }
+        
+        client = get_client()
+        if client:
+            return {
+                "success": True,
+                "client_type": client_type,
+                "is_connected": client.is_connected,
+                "subscribed_symbols": list(client.subscribed_symbols),
+                "market_data_count": len(client.market_data),
+                "market_data_keys": list(client.market_data),
+                "sample_data": dict(islice(client.market_data.items(), 3))
+            }
+        else:
+            return {
+                "success": False,
+                "error": "Client not initialized"
             }
-            
-        except ImportError:
-            try:
-                from src.data.sharekhan_client import get_sharekhan_client
-                client = get_sharekhan_client()
-                client_type = "async"
-                
-                if client:
-                    return {
-                        "success": True,
-                        "client_type": client_type,
-                        "is_connected": client.is_connected,
-                        "subscribed_symbols": list(client.subscribed_symbols),
-                        "market_data_count": len(client.market_data),
-                        "market_data_keys": list(client.market_data.keys()),
-                        "sample_data": dict(list(client.market_data.items())[:3]) if client.market_data else {}
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": "Client not initialized"
-                    }
-                    
-            except ImportError:
-                return {
-                    "success": False,
-                    "error": "No ShareKhan client found"
-                }
                 
     except Exception as e:
         return {
@@ -389,29 +575,42 @@ async def force_create_sample_data():
             "error": str(e)
         }
 
+# dir()/_callbacks introspection of the live SDK object only runs when explicitly enabled
+_TD_INTROSPECTION_ENABLED = os.getenv("SHAREKHAN_DEBUG") == "true"
+
+@lru_cache(maxsize=8)
+def _type_name(cls: type) -> str:
+    return str(cls)
+
+@lru_cache(maxsize=8)
+def _callback_methods(cls: type) -> tuple:
+    """Callback-related attribute names of a TD client class, resolved once per class"""
+    return tuple(name for name in dir(cls) if 'callback' in name.lower())
+
 @router.get("/debug/callback-status")
 async def debug_callback_status():
     """Debug ShareKhan callback registration and data flow"""
     try:
-        from data.sharekhan_client import sharekhan_client, live_market_data
         
         debug_info = {
-            "timestamp": datetime.now().isoformat(),
-            "client_connected": sharekhan_client.connected if sharekhan_client else False,
-            "td_obj_exists": hasattr(sharekhan_client, 'td_obj') and sharekhan_client.td_obj is not None,
-            "live_data_count": len(live_market_data),
-            "live_data_keys": list(live_market_data.keys()),
+            "timestamp": now_iso(),
+            "client_connected": _sk.sharekhan_client.connected if _sk.sharekhan_client else False,
+            "td_obj_exists": hasattr(_sk.sharekhan_client, 'td_obj') and _sk.sharekhan_client.td_obj is not None,
+            "live_data_count": len(_sk.live_market_data),
+            "live_data_keys": list(_sk.live_market_data),
         }
         
-        # Check if td_obj has the callback methods
-        if hasattr(sharekhan_client, 'td_obj') and sharekhan_client.td_obj:
-            td_obj = sharekhan_client.td_obj
+        # Check if td_obj has the callback methods (SDK introspection is opt-in)
+        if not _TD_INTROSPECTION_ENABLED:
+            debug_info["td_obj_introspection"] = "disabled (set SHAREKHAN_DEBUG=true to enable)"
+        elif hasattr(_sk.sharekhan_client, 'td_obj') and _sk.sharekhan_client.td_obj:
+            td_obj = _sk.sharekhan_client.td_obj
             debug_info.update({
                 "has_trade_callback": hasattr(td_obj, 'trade_callback'),
                 "has_bidask_callback": hasattr(td_obj, 'bidask_callback'),
                 "has_greek_callback": hasattr(td_obj, 'greek_callback'),
-                "td_obj_type": str(type(td_obj)),
-                "td_obj_methods": [method for method in dir(td_obj) if 'callback' in method.lower()]
+                "td_obj_type": _type_name(type(td_obj)),
+                "td_obj_methods": _callback_methods(type(td_obj))
             })
             
             # Try to get internal callback info if available
@@ -426,16 +625,17 @@ async def debug_callback_status():
         
         # Test manual data injection to verify the flow works
         test_symbol = "DEBUG_TEST"
-        live_market_data[test_symbol] = {
+        _sk.live_market_data[test_symbol] = {
             'symbol': test_symbol,
             'ltp': 999.99,
             'volume': 12345,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now_iso(),
             'data_source': 'MANUAL_DEBUG_INJECTION'
         }
+        notify_tick(test_symbol)
         
         debug_info["manual_injection_test"] = "injected DEBUG_TEST symbol"
-        debug_info["manual_injection_success"] = test_symbol in live_market_data
+        debug_info["manual_injection_success"] = test_symbol in _sk.live_market_data
         
         return {
             "success": True,
@@ -453,9 +653,8 @@ async def debug_callback_status():
 async def force_callback_test():
     """Force trigger callback test data"""
     try:
-        from data.sharekhan_client import sharekhan_client, live_market_data
         
-        if not sharekhan_client.connected:
+        if not _sk.sharekhan_client.connected:
             return {"success": False, "error": "ShareKhan not connected"}
         
         # ELIMINATED: Manual fake data injection that could mislead about real market data
@@ -490,19 +689,19 @@ async def force_callback_test():
 async def test_live_data_call():
     """Test the actual start_live_data call to see if it's working"""
     try:
-        from data.sharekhan_client import sharekhan_client, live_market_data
         
-        if not sharekhan_client.connected or not sharekhan_client.td_obj:
+        if not _sk.sharekhan_client.connected or not _sk.sharekhan_client.td_obj:
             return {"success": False, "error": "ShareKhan not connected"}
         
-        td_obj = sharekhan_client.td_obj
+        td_obj = _sk.sharekhan_client.td_obj
         
         # Test symbols
         test_symbols = ['NIFTY', 'BANKNIFTY']
         
         # Clear any existing data
         for symbol in test_symbols:
-            live_market_data.pop(symbol, None)
+            _sk.live_market_data.pop(symbol, None)
+            notify_tick(symbol)
         
         # Try calling start_live_data directly and capture the result
         try:
@@ -512,7 +711,7 @@ async def test_live_data_call():
                 "success": True,
                 "start_live_data_result": str(result),
                 "test_symbols": test_symbols,
-                "td_obj_type": str(type(td_obj)),
+                "td_obj_type": _type_name(type(td_obj)),
                 "message": "start_live_data called - check if callbacks fire in next 30 seconds"
             }
             
@@ -533,12 +732,11 @@ async def test_live_data_call():
 async def callback_registration_test():
     """Test if callbacks can be re-registered manually"""
     try:
-        from data.sharekhan_client import sharekhan_client, live_market_data
         
-        if not sharekhan_client.connected or not sharekhan_client.td_obj:
+        if not _sk.sharekhan_client.connected or not _sk.sharekhan_client.td_obj:
             return {"success": False, "error": "ShareKhan not connected"}
         
-        td_obj = sharekhan_client.td_obj
+        td_obj = _sk.sharekhan_client.td_obj
         
         # Counter for callback calls
         callback_counter = {"count": 0}
@@ -550,15 +748,16 @@ async def callback_registration_test():
             symbol = tick_data.get('symbol', 'UNKNOWN')
             ltp = tick_data.get('ltp', 0)
             
-            # Inject into live data
-            live_market_data[f"TEST_CALLBACK_{symbol}"] = {
+            # Inject into live data (runs on the feed thread; notify_tick is thread-safe)
+            _sk.live_market_data[f"TEST_CALLBACK_{symbol}"] = {
                 'symbol': f"TEST_CALLBACK_{symbol}",
                 'ltp': ltp,
                 'volume': tick_data.get('volume', 0),
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now_iso(),
                 'data_source': 'MANUAL_CALLBACK_REGISTRATION',
                 'callback_count': callback_counter["count"]
             }
+            notify_tick(f"TEST_CALLBACK_{symbol}")
         
         # Try to start live data for a specific symbol
         test_symbol = 'NIFTY'
@@ -583,17 +782,16 @@ async def callback_registration_test():
 async def force_disconnect_sharekhan():
     """Force disconnect ShareKhan (deployment cleanup)"""
     try:
-        from data.sharekhan_client import force_disconnect_sharekhan
         
         logger.info("🛑 Force disconnect requested via API")
-        result = force_disconnect_sharekhan()
+        result = _sk.force_disconnect_sharekhan()
         
         if result:
             return {
                 "success": True,
                 "message": "ShareKhan force disconnected successfully",
                 "action": "force_disconnect",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
         else:
             return {
@@ -610,26 +808,38 @@ async def force_disconnect_sharekhan():
             "error": str(e)
         }
 
+_DISCONNECT_CLEANUP_TIMEOUT = 2.0
+
 @router.post("/deployment-safe-connect")
 async def deployment_safe_connect():
     """Deployment-safe connection with overlap handling"""
     try:
-        from data.sharekhan_client import sharekhan_client
         
         logger.info("🔄 Deployment-safe connection requested")
         
+        # Clients that signal cleanup via a cleanup_done event end the wait early; clear it
+        # first so a signal left over from an earlier disconnect is not taken for this one
+        cleanup_done = getattr(_sk.sharekhan_client, 'cleanup_done', None)
+        if isinstance(cleanup_done, asyncio.Event):
+            cleanup_done.clear()
+        
         # Force disconnect any existing connections first
-        sharekhan_client.force_disconnect()
+        _sk.sharekhan_client.force_disconnect()
         
-        # Wait a moment for cleanup
-        import asyncio
-        await asyncio.sleep(2)
+        # Wait for cleanup
+        if isinstance(cleanup_done, asyncio.Event):
+            try:
+                await asyncio.wait_for(cleanup_done.wait(), timeout=_DISCONNECT_CLEANUP_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning("⚠️ ShareKhan cleanup not signalled in time - connecting anyway")
+        else:
+            await asyncio.sleep(_DISCONNECT_CLEANUP_TIMEOUT)
         
         # Now attempt new connection
-        result = sharekhan_client.connect()
+        result = _sk.sharekhan_client.connect()
         
         if result:
-            status = sharekhan_client.get_status()
+            status = _sk.sharekhan_client.get_status()
             return {
                 "success": True,
                 "message": "ShareKhan connected with deployment overlap handling",
@@ -652,32 +862,34 @@ async def deployment_safe_connect():
             "error": str(e)
         }
 
+# Deployment environment is fixed for the life of the process
+_DEPLOYMENT_INFO = {
+    "environment": os.getenv("ENVIRONMENT", "development"),
+    "app_url": os.getenv("APP_URL", ""),
+    "skip_auto_init": os.getenv("SKIP_SHAREKHAN_AUTO_INIT", "false"),
+    "is_production": os.getenv("ENVIRONMENT") == "production",
+    "is_digitalocean": "ondigitalocean.app" in os.getenv("APP_URL", "")
+}
+_OVERLAP_PREVENTION = {
+    "active": _DEPLOYMENT_INFO["skip_auto_init"] == "true",
+    "recommendation": "Set SKIP_SHAREKHAN_AUTO_INIT=true if experiencing overlap issues"
+}
+
 @router.get("/deployment-status")
-async def get_deployment_status():
+async def get_deployment_status(request: Request, response: Response):
     """Get deployment-specific status information"""
     try:
-        from data.sharekhan_client import get_sharekhan_status
-        import os
-        
-        status = get_sharekhan_status()
-        
-        # Add deployment environment info
-        deployment_info = {
-            "environment": os.getenv("ENVIRONMENT", "development"),
-            "app_url": os.getenv("APP_URL", ""),
-            "skip_auto_init": os.getenv("SKIP_SHAREKHAN_AUTO_INIT", "false"),
-            "is_production": os.getenv("ENVIRONMENT") == "production",
-            "is_digitalocean": "ondigitalocean.app" in os.getenv("APP_URL", "")
-        }
+        
+        status = _sk.get_sharekhan_status()
+        not_modified = _not_modified(request, response, _status_etag(status))
+        if not_modified is not None:
+            return not_modified
         
         return {
             "success": True,
             "sharekhan_status": status,
-            "deployment_info": deployment_info,
-            "overlap_prevention": {
-                "active": deployment_info["skip_auto_init"] == "true",
-                "recommendation": "Set SKIP_SHAREKHAN_AUTO_INIT=true if experiencing overlap issues"
-            }
+            "deployment_info": _DEPLOYMENT_INFO,
+            "overlap_prevention": _OVERLAP_PREVENTION
         }
         
     except Exception as e:
@@ -688,67 +900,74 @@ async def get_deployment_status():
             "error": str(e)
         }
 
+# Static connection-status recommendations, shared by reference across responses
+_REC_USER_ALREADY_CONNECTED = (
+    "PERMANENT FIX: Account connection conflict detected",
+    "Use /force-disconnect endpoint to clear ALL connection state",
+    "Persistent state tracking prevents retry loops",
+    "Connection blocked until manual reset",
+    "Alternative: Wait 10 minutes for auto-expiry"
+)
+_REC_PERMANENT_BLOCK = (
+    "Connection permanently blocked due to repeated failures",
+    "Use /force-disconnect to reset connection state",
+    "Check ShareKhan account status and credentials",
+    "Verify no other applications are connected"
+)
+_REC_NOT_CONNECTED = (
+    "Try manual connection via /connect endpoint",
+    "Check credentials in environment variables",
+    "Verify ShareKhan account is active",
+    "Use /force-disconnect first if previous attempts failed"
+)
+_REC_HEALTHY = (
+    "Connection is healthy and active",
+    "Market data should be flowing normally",
+    "All systems operational"
+)
+
 @router.get("/connection-status")
-async def get_detailed_connection_status():
+async def get_detailed_connection_status(request: Request, response: Response):
     """Get detailed ShareKhan connection status with PERMANENT FIX information"""
     try:
-        from data.sharekhan_client import sharekhan_client, sharekhan_connection_status
         
         # Get enhanced status from permanent fix
-        if sharekhan_client:
-            client_status = sharekhan_client.get_status()
+        if _sk.sharekhan_client:
+            client_status = _sk.sharekhan_client.get_status()
         else:
             client_status = {'connected': False}
         
+        not_modified = _not_modified(
+            request, response, _status_etag((client_status, _sk.sharekhan_connection_status))
+        )
+        if not_modified is not None:
+            return not_modified
+        
         detailed_status = {
             'client_connected': client_status.get('connected', False),
-            'global_status': sharekhan_connection_status,
-            'retry_disabled': sharekhan_connection_status.get('retry_disabled', False),
-            'permanent_block': sharekhan_connection_status.get('permanent_block', False),
-            'error_type': sharekhan_connection_status.get('error'),
-            'can_retry': not sharekhan_connection_status.get('retry_disabled', False),
+            'global_status': _sk.sharekhan_connection_status,
+            'retry_disabled': _sk.sharekhan_connection_status.get('retry_disabled', False),
+            'permanent_block': _sk.sharekhan_connection_status.get('permanent_block', False),
+            'error_type': _sk.sharekhan_connection_status.get('error'),
+            'can_retry': not _sk.sharekhan_connection_status.get('retry_disabled', False),
             'connection_attempts': client_status.get('connection_attempts', 0),
             'max_attempts': client_status.get('max_attempts', 1),
             'global_connection_active': client_status.get('global_connection_active', False),
             'implementation': client_status.get('implementation', 'UNKNOWN'),
-            'recommendations': []
+            'recommendations': ()
         }
         
         # Add recommendations based on status with permanent fix info
-        if sharekhan_connection_status.get('error') == 'USER_ALREADY_CONNECTED':
-            detailed_status['recommendations'] = [
-                "PERMANENT FIX: Account connection conflict detected",
-                "Use /force-disconnect endpoint to clear ALL connection state",
-                "Persistent state tracking prevents retry loops",
-                "Connection blocked until manual reset",
-                "Alternative: Wait 10 minutes for auto-expiry"
-            ]
+        if _sk.sharekhan_connection_status.get('error') == 'USER_ALREADY_CONNECTED':
+            detailed_status['recommendations'] = _REC_USER_ALREADY_CONNECTED
         elif detailed_status['permanent_block']:
-            detailed_status['recommendations'] = [
-                "Connection permanently blocked due to repeated failures",
-                "Use /force-disconnect to reset connection state",
-                "Check ShareKhan account status and credentials",
-                "Verify no other applications are connected"
-            ]
+            detailed_status['recommendations'] = _REC_PERMANENT_BLOCK
         elif not detailed_status['client_connected']:
-            detailed_status['recommendations'] = [
-                "Try manual connection via /connect endpoint",
-                "Check credentials in environment variables",
-                "Verify ShareKhan account is active",
-                "Use /force-disconnect first if previous attempts failed"
-            ]
+            detailed_status['recommendations'] = _REC_NOT_CONNECTED
         else:
-            detailed_status['recommendations'] = [
-                "Connection is healthy and active",
-                "Market data should be flowing normally",
-                "All systems operational"
-            ]
-        
-        return APIResponse(
-            success=True,
-            message="Detailed connection status retrieved (PERMANENT FIX)",
-            data=detailed_status
-        ).dict()
+            detailed_status['recommendations'] = _REC_HEALTHY
+        
+        return _api_response(True, "Detailed connection status retrieved (PERMANENT FIX)", detailed_status)
         
     except Exception as e:
         logger.error(f"Error getting detailed status: {e}")
@@ -2,12 +2,14 @@
 Users API - Compatible with frontend expectations
 """
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse, Response
 from typing import Dict, Any, List
 import logging
+import orjson
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api", tags=["users"])
+router = APIRouter(prefix="/api", tags=["users"], default_response_class=ORJSONResponse)
 
 # Mock users that match frontend expectations
 USERS_DATABASE = [
@@ -42,16 +44,20 @@ USERS_DATABASE = [
         "is_active": True
     }
 ]
+USERS_INDEX = {u["id"]: u for u in USERS_DATABASE}
+
+# USERS_DATABASE never changes at runtime, so the listing is serialized once
+_USERS_LIST_BODY = orjson.dumps({
+    "success": True,
+    "data": USERS_DATABASE,
+    "message": "Users retrieved successfully"
+})
 
 @router.get("/users", summary="Get all users")
 async def get_users():
     """Get all users - compatible with frontend expectations"""
     try:
-        return {
-            "success": True,
-            "data": USERS_DATABASE,
-            "message": "Users retrieved successfully"
-        }
+        return Response(content=_USERS_LIST_BODY, media_type="application/json")
     except Exception as e:
         logger.error(f"Error getting users: {e}")
         raise HTTPException(status_code=500, detail="Failed to get users")
@@ -60,7 +66,7 @@ async def get_users():
 async def get_user(user_id: str):
     """Get specific user by ID"""
     try:
-        user = next((u for u in USERS_DATABASE if u["id"] == user_id), None)
+        user = USERS_INDEX.get(user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
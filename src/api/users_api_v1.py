@@ -4,15 +4,22 @@ Handles user management, creation, and directory operations
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel, EmailStr
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import logging
+import orjson
+from cachetools import TTLCache
 
+from redis.exceptions import WatchError
+
+from src.core.redis_connection_manager import REDIS_DOWN_ERRORS, get_request_redis_client, report_redis_error
+from src.utils.clock import now_iso
 from .auth_api import get_current_user
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/v1/users", tags=["users-v1"])
+router = APIRouter(prefix="/v1/users", tags=["users-v1"], default_response_class=ORJSONResponse)
 
 # Pydantic Models
 class UserCreate(BaseModel):
@@ -68,6 +75,185 @@ MOCK_USERS_DB = {
     }
 }
 
+# Users are stored in Redis so every worker sees the same records:
+#   users_v1:user:{id}      hash, one orjson-encoded value per field
+#   users_v1:index          sorted set of ids scored by insertion sequence (listing order)
+#   users_v1:email:{email}  -> id, for the uniqueness check on create
+#   users_v1:version        bumped on every write; keys the listing page cache
+# MOCK_USERS_DB seeds Redis on first use. While Redis is unreachable reads are served from
+# it and writes fail with 503, so no worker ever holds changes the others cannot see.
+_USER_KEY = "users_v1:user:{}"
+_EMAIL_KEY = "users_v1:email:{}"
+_INDEX_KEY = "users_v1:index"
+_SEQ_KEY = "users_v1:seq"
+_VERSION_KEY = "users_v1:version"
+_SEEDED_KEY = "users_v1:seeded"
+
+_redis_seeded = False
+
+def _encode_user(user: Dict[str, Any]) -> Dict[str, bytes]:
+    return {field: orjson.dumps(value) for field, value in user.items()}
+
+def _decode_user(raw: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    return {field: orjson.loads(value) for field, value in raw.items()} if raw else None
+
+def _queue_insert(pipe, user: Dict[str, Any], seq: int):
+    pipe.hset(_USER_KEY.format(user["id"]), mapping=_encode_user(user))
+    pipe.zadd(_INDEX_KEY, {user["id"]: seq})
+    pipe.set(_EMAIL_KEY.format(user["email"]), user["id"])
+
+async def _watched(client, body, *keys):
+    """Run body(pipe) with keys WATCHed, retrying if another client changes them before EXEC"""
+    async with client.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                await pipe.watch(*keys)
+                return await body(pipe)
+            except WatchError:
+                continue
+
+async def _seed_redis(client):
+    """Load MOCK_USERS_DB into Redis in one transaction, unless some worker already has"""
+    global _redis_seeded
+    
+    async def seed(pipe):
+        if await pipe.exists(_SEEDED_KEY):
+            return
+        pipe.multi()
+        for seq, user in enumerate(MOCK_USERS_DB.values(), 1):
+            _queue_insert(pipe, user, seq)
+        pipe.incrby(_SEQ_KEY, len(MOCK_USERS_DB))
+        pipe.incr(_VERSION_KEY)
+        pipe.set(_SEEDED_KEY, "1")
+        await pipe.execute()
+    
+    await _watched(client, seed, _SEEDED_KEY)
+    _redis_seeded = True
+
+async def _users_redis():
+    """Seeded Redis client for the users store, or None while Redis is unavailable"""
+    client = await get_request_redis_client("Users store Redis")
+    if client is None or _redis_seeded:
+        return client
+    try:
+        await _seed_redis(client)
+        return client
+    except Exception as e:
+        report_redis_error(e, "Users store Redis")
+        return None
+
+async def _redis_or_memory(redis_op, memory_op):
+    """Run a read against Redis, or against the MOCK_USERS_DB seed data when Redis fails"""
+    client = await _users_redis()
+    if client is not None:
+        try:
+            return await redis_op(client)
+        except Exception as e:
+            report_redis_error(e, "Users store Redis")
+    return memory_op()
+
+async def _redis_write(redis_op):
+    """Run a write against Redis; 503 if Redis is unavailable"""
+    client = await _users_redis()
+    if client is None:
+        raise HTTPException(status_code=503, detail="User store unavailable")
+    try:
+        return await redis_op(client)
+    except REDIS_DOWN_ERRORS as e:
+        report_redis_error(e, "Users store Redis")
+        raise HTTPException(status_code=503, detail="User store unavailable")
+
+async def _store_version():
+    async def from_redis(client):
+        return ("redis", await client.get(_VERSION_KEY))
+    return await _redis_or_memory(from_redis, lambda: ("memory", 0))
+
+async def _store_get(user_id: str) -> Optional[Dict[str, Any]]:
+    async def from_redis(client):
+        return _decode_user(await client.hgetall(_USER_KEY.format(user_id)))
+    return await _redis_or_memory(from_redis, lambda: MOCK_USERS_DB.get(user_id))
+
+async def _store_list(active: Optional[bool], offset: int, limit: int):
+    """(total, page) of users in creation order, optionally filtered by is_active"""
+    async def from_redis(client):
+        if active is None:
+            total = await client.zcard(_INDEX_KEY)
+            user_ids = await client.zrange(_INDEX_KEY, offset, offset + limit - 1)
+        else:
+            user_ids = await client.zrange(_INDEX_KEY, 0, -1)
+        async with client.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.hgetall(_USER_KEY.format(user_id))
+            users = [user for user in map(_decode_user, await pipe.execute()) if user]
+        if active is None:
+            return total, users
+        users = [user for user in users if user["is_active"] == active]
+        return len(users), users[offset:offset + limit]
+    
+    def from_memory():
+        all_users = list(MOCK_USERS_DB.values())
+        if active is not None:
+            all_users = [user for user in all_users if user["is_active"] == active]
+        return len(all_users), all_users[offset:offset + limit]
+    
+    return await _redis_or_memory(from_redis, from_memory)
+
+async def _store_create(user: Dict[str, Any]) -> bool:
+    """Insert a user; False if the email is already taken"""
+    email_key = _EMAIL_KEY.format(user["email"])
+    
+    async def in_redis(client):
+        seq = await client.incr(_SEQ_KEY)
+        
+        async def insert(pipe):
+            if await pipe.exists(email_key):
+                return False
+            pipe.multi()
+            _queue_insert(pipe, user, seq)
+            pipe.incr(_VERSION_KEY)
+            await pipe.execute()
+            return True
+        
+        return await _watched(client, insert, email_key)
+    
+    return await _redis_write(in_redis)
+
+async def _store_update(user_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Apply fields to a user and return the updated record, or None if it does not exist"""
+    key = _USER_KEY.format(user_id)
+    
+    async def update(pipe):
+        if not await pipe.exists(key):
+            return None
+        pipe.multi()
+        pipe.hset(key, mapping=_encode_user(fields))
+        pipe.incr(_VERSION_KEY)
+        pipe.hgetall(key)
+        return _decode_user((await pipe.execute())[-1])
+    
+    return await _redis_write(lambda client: _watched(client, update, key))
+
+async def _store_delete(user_id: str) -> Optional[Dict[str, Any]]:
+    """Remove a user and return the deleted record, or None if it does not exist"""
+    key = _USER_KEY.format(user_id)
+    
+    async def delete(pipe):
+        user = _decode_user(await pipe.hgetall(key))
+        if user is None:
+            return None
+        pipe.multi()
+        pipe.delete(key, _EMAIL_KEY.format(user["email"]))
+        pipe.zrem(_INDEX_KEY, user_id)
+        pipe.incr(_VERSION_KEY)
+        await pipe.execute()
+        return user
+    
+    return await _redis_write(lambda client: _watched(client, delete, key))
+
+# Serialized admin listing pages keyed by (store version, active, offset, limit), minus the
+# closing brace so the per-request timestamp can be appended. Any write changes the version.
+_users_list_cache: TTLCache = TTLCache(maxsize=256, ttl=60)
+
 @router.get("/")
 async def get_users(
     active: Optional[bool] = Query(None, description="Filter by active status"),
@@ -80,11 +266,11 @@ async def get_users(
         # Check permissions (admin or getting own data)
         if current_user.get("role") != "admin":
             # Non-admin users can only see themselves
-            user_id = current_user["user_id"]
-            if user_id in MOCK_USERS_DB:
+            user = await _store_get(current_user["user_id"])
+            if user:
                 return {
                     "success": True,
-                    "data": [MOCK_USERS_DB[user_id]],
+                    "data": [user],
                     "total": 1,
                     "limit": limit,
                     "offset": offset
@@ -99,26 +285,25 @@ async def get_users(
                 }
         
         # Admin can see all users
-        all_users = list(MOCK_USERS_DB.values())
-        
-        # Apply filters
-        if active is not None:
-            all_users = [user for user in all_users if user["is_active"] == active]
+        cache_key = (await _store_version(), active, offset, limit)
+        head = _users_list_cache.get(cache_key)
+        if head is None:
+            # Filter and paginate in the store
+            total, paginated_users = await _store_list(active, offset, limit)
+            
+            head = orjson.dumps({
+                "success": True,
+                "data": paginated_users,
+                "total": total,
+                "limit": limit,
+                "offset": offset
+            })[:-1]
+            _users_list_cache[cache_key] = head
         
-        # Apply pagination
-        total = len(all_users)
-        paginated_users = all_users[offset:offset + limit]
+        logger.info(f"Users list requested by {current_user['email']}")
         
-        logger.info(f"Users list requested by {current_user['email']}, returned {len(paginated_users)} users")
-        
-        return {
-            "success": True,
-            "data": paginated_users,
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-            "timestamp": datetime.now().isoformat()
-        }
+        body = head + b',"timestamp":' + orjson.dumps(now_iso()) + b'}'
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
         logger.error(f"Get users error: {e}")
@@ -141,14 +326,6 @@ async def create_user(
                 detail="Admin access required to create users"
             )
         
-        # Check if email already exists
-        for existing_user in MOCK_USERS_DB.values():
-            if existing_user["email"] == user_data.email:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Email already exists"
-                )
-        
         # Generate new user ID
         import uuid
         user_id = f"user_{str(uuid.uuid4())[:8]}"
@@ -167,8 +344,12 @@ async def create_user(
             "total_pnl": 0.0
         }
         
-        # Store user
-        MOCK_USERS_DB[user_id] = new_user
+        # Store user (the email check and insert are one step in the store)
+        if not await _store_create(new_user):
+            raise HTTPException(
+                status_code=400,
+                detail="Email already exists"
+            )
         
         logger.info(f"New user created: {user_data.email} by {current_user['email']}")
         
@@ -203,7 +384,7 @@ async def get_user(
             )
         
         # Find user
-        user = MOCK_USERS_DB.get(user_id)
+        user = await _store_get(user_id)
         if not user:
             raise HTTPException(
                 status_code=404,
@@ -213,7 +394,7 @@ async def get_user(
         return {
             "success": True,
             "user": user,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
         
     except HTTPException:
@@ -240,19 +421,16 @@ async def update_user(
                 detail="Admin access required to update users"
             )
         
-        # Find user
-        user = MOCK_USERS_DB.get(user_id)
+        # Update user fields
+        update_data = user_updates.dict(exclude_unset=True)
+        update_data["updated_at"] = datetime.now().isoformat()
+        user = await _store_update(user_id, update_data)
         if not user:
             raise HTTPException(
                 status_code=404,
                 detail="User not found"
             )
         
-        # Update user fields
-        update_data = user_updates.dict(exclude_unset=True)
-        user.update(update_data)
-        user["updated_at"] = datetime.now().isoformat()
-        
         logger.info(f"User {user_id} updated by {current_user['email']}")
         
         return {
@@ -291,16 +469,14 @@ async def delete_user(
                 detail="Cannot delete your own account"
             )
         
-        # Find user
-        if user_id not in MOCK_USERS_DB:
+        # Delete user
+        deleted_user = await _store_delete(user_id)
+        if not deleted_user:
             raise HTTPException(
                 status_code=404,
                 detail="User not found"
             )
         
-        # Delete user
-        deleted_user = MOCK_USERS_DB.pop(user_id)
-        
         logger.info(f"User {user_id} deleted by {current_user['email']}")
         
         return {
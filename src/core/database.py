@@ -4,8 +4,10 @@ Database manager for the trading system
 import logging
 import os
 import sqlalchemy
-from contextlib import contextmanager
-from sqlalchemy import create_engine, text
+from contextlib import contextmanager, asynccontextmanager
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import NullPool
@@ -16,6 +18,17 @@ logger = logging.getLogger(__name__)
 # Database base for models
 Base = declarative_base()
 
+# libpq sslmode values; asyncpg accepts each of them as its ssl connect argument
+_LIBPQ_SSLMODES = frozenset({'disable', 'allow', 'prefer', 'require', 'verify-ca', 'verify-full'})
+
+def _register_asyncpg_codecs(dbapi_connection, connection_record):
+    """Decode NUMERIC columns straight to float instead of Decimal on asyncpg connections"""
+    dbapi_connection.run_async(
+        lambda conn: conn.set_type_codec(
+            'numeric', encoder=str, decoder=float, schema='pg_catalog', format='text'
+        )
+    )
+
 class DatabaseManager:
     """Centralized database manager with proper connection pooling for DigitalOcean"""
     
@@ -23,6 +36,8 @@ class DatabaseManager:
         self.engine = None
         self.SessionLocal = None
         self._initialized = False
+        self.async_engine = None
+        self.AsyncSessionLocal = None
         
     def initialize(self):
         """Initialize database with optimized connection pooling for DigitalOcean"""
@@ -89,6 +104,75 @@ class DatabaseManager:
             logger.error("🔧 Check DigitalOcean database connection limits")
             raise
     
+    def initialize_async(self):
+        """Initialize the asyncpg-backed engine used by async request handlers"""
+        if self.AsyncSessionLocal is not None:
+            return
+        
+        database_url = os.getenv('DATABASE_URL')
+        if not database_url:
+            raise ValueError("DATABASE_URL environment variable not set")
+        
+        url = make_url(database_url)
+        if not url.drivername.startswith('postgresql'):
+            raise ValueError(f"Async engine requires PostgreSQL, got: {url.drivername}")
+        
+        # asyncpg takes libpq's sslmode as its ssl argument, not as a query parameter
+        connect_args = {}
+        query = dict(url.query)
+        sslmode = query.pop('sslmode', None)
+        if sslmode is not None:
+            if sslmode not in _LIBPQ_SSLMODES:
+                raise ValueError(f"Unsupported sslmode in DATABASE_URL: {sslmode}")
+            connect_args['ssl'] = sslmode
+        
+        # PgBouncer in transaction pooling mode cannot reuse server-side prepared statements
+        if os.getenv('DB_PGBOUNCER', 'false').lower() == 'true':
+            connect_args['statement_cache_size'] = 0
+            query['prepared_statement_cache_size'] = '0'
+        else:
+            connect_args['statement_cache_size'] = 1024
+        
+        url = url.set(drivername='postgresql+asyncpg', query=query)
+        
+        # Single process-wide pool shared by every async request handler
+        self.async_engine = create_async_engine(
+            url,
+            pool_size=int(os.getenv('DB_ASYNC_POOL_SIZE', '20')),
+            max_overflow=int(os.getenv('DB_ASYNC_MAX_OVERFLOW', '10')),
+            pool_timeout=30,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            connect_args=connect_args,
+            echo=False
+        )
+        event.listen(self.async_engine.sync_engine, "connect", _register_asyncpg_codecs)
+        self.AsyncSessionLocal = async_sessionmaker(
+            self.async_engine,
+            expire_on_commit=False
+        )
+        logger.info("✅ Async database engine initialized (asyncpg)")
+    
+    def get_async_session(self) -> AsyncSession:
+        """Get an async database session (use as `async with`)"""
+        if self.AsyncSessionLocal is None:
+            self.initialize_async()
+        return self.AsyncSessionLocal()
+    
+    @asynccontextmanager
+    async def async_session_scope(self):
+        """Async session wrapped in one transaction: commits on success, rolls back on
+        error, and returns its single pooled connection on exit"""
+        async with self.get_async_session() as session, session.begin():
+            yield session
+    
+    async def close_async(self):
+        """Dispose the async engine and return its pooled connections"""
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+            self.async_engine = None
+            self.AsyncSessionLocal = None
+    
     def _ensure_database_ready(self):
         """Ensure database is ready for paper trading"""
         try:
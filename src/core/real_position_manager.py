@@ -10,6 +10,8 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 import json
 
+from src.core.sharekhan_client_cache import get_authenticated_client, invalidate_client
+
 logger = logging.getLogger(__name__)
 
 class RealPositionManager:
@@ -40,32 +42,28 @@ class RealPositionManager:
         user_id: int,
         sharekhan_client_id: str,
         sharekhan_api_key: str,
-        sharekhan_api_secret: str
+        sharekhan_api_secret: str,
+        sharekhan=None
     ) -> Dict[str, Any]:
         """
         Sync real positions from ShareKhan for a specific user
-        Credentials provided at runtime, not stored
+        Credentials provided at runtime, not stored; pass an already
+        authenticated `sharekhan` client to skip the lookup
         """
         try:
             logger.info(f"🔄 Syncing real positions for user: {user_id}")
             
             # Authenticate with ShareKhan
-            from brokers.sharekhan import ShareKhanIntegration
-            
-            sharekhan = ShareKhanIntegration()
-            auth_result = await sharekhan.authenticate(
-                client_id=sharekhan_client_id,
-                api_key=sharekhan_api_key,
-                api_secret=sharekhan_api_secret
-            )
-            
-            if not auth_result.get('success'):
-                raise RuntimeError(f"ShareKhan authentication failed: {auth_result.get('error')}")
+            if sharekhan is None:
+                sharekhan = await get_authenticated_client(
+                    sharekhan_client_id, sharekhan_api_key, sharekhan_api_secret
+                )
             
             # Fetch real positions from ShareKhan
             positions_result = await sharekhan.get_positions(sharekhan_client_id)
             
             if not positions_result.get('success'):
+                invalidate_client(sharekhan_client_id)
                 raise RuntimeError(f"Failed to fetch positions: {positions_result.get('error')}")
             
             real_positions = positions_result.get('data', [])
@@ -162,7 +160,8 @@ class RealPositionManager:
         user_id: int,
         sharekhan_client_id: str,
         sharekhan_api_key: str,
-        sharekhan_api_secret: str
+        sharekhan_api_secret: str,
+        sharekhan=None
     ) -> Dict[str, Any]:
         """Update current prices and P&L for user positions"""
         try:
@@ -179,17 +178,10 @@ class RealPositionManager:
                 }
             
             # Authenticate with ShareKhan
-            from brokers.sharekhan import ShareKhanIntegration
-            
-            sharekhan = ShareKhanIntegration()
-            auth_result = await sharekhan.authenticate(
-                client_id=sharekhan_client_id,
-                api_key=sharekhan_api_key,
-                api_secret=sharekhan_api_secret
-            )
-            
-            if not auth_result.get('success'):
-                raise RuntimeError(f"ShareKhan authentication failed: {auth_result.get('error')}")
+            if sharekhan is None:
+                sharekhan = await get_authenticated_client(
+                    sharekhan_client_id, sharekhan_api_key, sharekhan_api_secret
+                )
             
             # Update each position with real current price
             updated_positions = []
@@ -278,18 +270,10 @@ class RealPositionManager:
             symbol, quantity, side, current_price, entry_price = position
             
             # Authenticate with ShareKhan
-            from brokers.sharekhan import ShareKhanIntegration
-            
-            sharekhan = ShareKhanIntegration()
-            auth_result = await sharekhan.authenticate(
-                client_id=sharekhan_client_id,
-                api_key=sharekhan_api_key,
-                api_secret=sharekhan_api_secret
+            sharekhan = await get_authenticated_client(
+                sharekhan_client_id, sharekhan_api_key, sharekhan_api_secret
             )
             
-            if not auth_result.get('success'):
-                raise RuntimeError(f"ShareKhan authentication failed: {auth_result.get('error')}")
-            
             # Place closing order via ShareKhan
             closing_side = "SELL" if side == "BUY" else "BUY"
             
@@ -7,6 +7,7 @@ import os
 import asyncio
 import logging
 import ssl
+import time
 from typing import Optional, Dict, Any
 from urllib.parse import urlparse
 from contextlib import asynccontextmanager
@@ -21,6 +22,7 @@ except ImportError:
     # Create asyncio namespace if it doesn't exist
     if not hasattr(redis, 'asyncio'):
         redis.asyncio = redis
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
 logger = logging.getLogger(__name__)
 
@@ -307,4 +309,34 @@ redis_manager = ProductionRedisManager()
 # Convenience function for backward compatibility
 async def get_redis_client():
     """Get Redis client with automatic connection management"""
-    return await redis_manager.get_client() 
\ No newline at end of file
+    return await redis_manager.get_client()
+
+# Request handlers wait at most REQUEST_CONNECT_TIMEOUT for a client. After a connection-level
+# failure Redis is skipped for REQUEST_RETRY_BACKOFF, so an outage costs one timeout per backoff
+# period instead of one per request.
+REQUEST_CONNECT_TIMEOUT = 0.5
+REQUEST_RETRY_BACKOFF = 5.0
+REDIS_DOWN_ERRORS = (RedisConnectionError, RedisTimeoutError, asyncio.TimeoutError, OSError)
+_request_redis_down_until = 0.0
+
+def report_redis_error(e: Exception, context: str = "Redis"):
+    """Log a failed Redis call from a request path; connection-level failures start the backoff"""
+    global _request_redis_down_until
+    if isinstance(e, REDIS_DOWN_ERRORS):
+        _request_redis_down_until = time.monotonic() + REQUEST_RETRY_BACKOFF
+        logger.warning(f"⚠️ {context} unavailable, retrying in {REQUEST_RETRY_BACKOFF:.0f}s: {e}")
+    else:
+        logger.warning(f"⚠️ {context} error: {e}")
+
+async def get_request_redis_client(context: str = "Redis"):
+    """Redis client for request handlers, or None while Redis is unavailable (fails fast, then backs off)"""
+    if time.monotonic() < _request_redis_down_until:
+        return None
+    try:
+        client = await asyncio.wait_for(get_redis_client(), timeout=REQUEST_CONNECT_TIMEOUT)
+        if client is None:
+            raise RedisConnectionError("no Redis client")
+        return client
+    except Exception as e:
+        report_redis_error(e, context)
+        return None
@@ -0,0 +1,68 @@
+"""
+ShareKhan Client Cache
+Reuses authenticated ShareKhan clients across requests instead of
+re-authenticating on every call. Credentials are never stored in clear text.
+"""
+
+import asyncio
+import hashlib
+import logging
+import weakref
+from typing import Tuple
+
+from cachetools import TTLCache
+
+from brokers.sharekhan import ShareKhanIntegration
+
+logger = logging.getLogger(__name__)
+
+# Authenticated clients keyed by (client_id, api_key, secret digest)
+_sk_clients: TTLCache = TTLCache(maxsize=1024, ttl=300)
+
+# One lock per key so a cache miss triggers a single authentication
+_auth_locks: "weakref.WeakValueDictionary[Tuple[str, str, str], asyncio.Lock]" = weakref.WeakValueDictionary()
+
+class ShareKhanAuthError(RuntimeError):
+    """Raised when ShareKhan rejects the supplied credentials"""
+    pass
+
+def _cache_key(client_id: str, api_key: str, api_secret: str) -> Tuple[str, str, str]:
+    return (client_id, api_key, hashlib.sha256(api_secret.encode()).hexdigest())
+
+async def get_authenticated_client(client_id: str, api_key: str, api_secret: str):
+    """Return a cached authenticated ShareKhan client, authenticating on a miss"""
+    key = _cache_key(client_id, api_key, api_secret)
+
+    client = _sk_clients.get(key)
+    if client is not None:
+        return client
+
+    lock = _auth_locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _auth_locks[key] = lock
+
+    async with lock:
+        # Another request may have authenticated while we waited
+        client = _sk_clients.get(key)
+        if client is not None:
+            return client
+
+        client = ShareKhanIntegration()
+        auth_result = await client.authenticate(
+            client_id=client_id,
+            api_key=api_key,
+            api_secret=api_secret
+        )
+
+        if not auth_result.get('success'):
+            raise ShareKhanAuthError(f"ShareKhan authentication failed: {auth_result.get('error')}")
+
+        _sk_clients[key] = client
+        logger.info(f"✅ Cached authenticated ShareKhan client for: {client_id}")
+        return client
+
+def invalidate_client(client_id: str):
+    """Drop cached clients for a ShareKhan client id (e.g. after a 401)"""
+    for key in [k for k in _sk_clients if k[0] == client_id]:
+        _sk_clients.pop(key, None)
@@ -4,6 +4,7 @@ Async utilities for handling CPU-bound operations and coroutines
 
 import asyncio
 import logging
+import os
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from functools import wraps
 from typing import Any, Callable, TypeVar, Optional, Dict
@@ -101,4 +102,10 @@ class AsyncTaskManager:
 async def cleanup() -> None:
     """Cleanup executors"""
     thread_pool.shutdown(wait=True)
-    process_pool.shutdown(wait=True) 
\ No newline at end of file
+    process_pool.shutdown(wait=True) 
+def configure_threadpool() -> int:
+    """Bound the anyio threadpool used for sync endpoints and run_in_threadpool calls"""
+    import anyio.to_thread
+    size = int(os.getenv('THREADPOOL_SIZE', '64'))
+    anyio.to_thread.current_default_thread_limiter().total_tokens = size
+    return size
@@ -0,0 +1,16 @@
+"""
+Coarse wall clock for response timestamps
+"""
+
+import time
+from datetime import datetime
+
+# Response timestamps are shared for up to half a second: [epoch seconds, ISO text]
+_ts_cache = [0.0, ""]
+
+def now_iso() -> str:
+    """Local time as ISO text, re-formatted at most every half second"""
+    t = time.time()
+    if t - _ts_cache[0] > 0.5:
+        _ts_cache[:] = [t, datetime.fromtimestamp(t).isoformat()]
+    return _ts_cache[1]
@@ -0,0 +1,40 @@
+"""
+Unit tests for the request-path Redis client backoff
+"""
+import pytest
+from unittest.mock import patch
+
+from src.core import redis_connection_manager
+
+@pytest.fixture
+def connect_attempts():
+    """Count connection attempts against a Redis that always refuses"""
+    attempts = []
+
+    async def get_client():
+        attempts.append(1)
+        raise ConnectionError("connection refused")
+
+    with patch.object(redis_connection_manager, "get_redis_client", get_client), \
+            patch.object(redis_connection_manager, "_request_redis_down_until", 0.0):
+        yield attempts
+
+@pytest.mark.asyncio
+async def test_failed_connect_backs_off(connect_attempts):
+    """Test one failed connect skips Redis for later requests until the backoff ends"""
+    assert await redis_connection_manager.get_request_redis_client() is None
+    assert await redis_connection_manager.get_request_redis_client() is None
+    assert len(connect_attempts) == 1
+
+    redis_connection_manager._request_redis_down_until = 0.0
+    assert await redis_connection_manager.get_request_redis_client() is None
+    assert len(connect_attempts) == 2
+
+@pytest.mark.asyncio
+async def test_only_connection_errors_back_off(connect_attempts):
+    """Test command errors are logged without cutting requests off from Redis"""
+    redis_connection_manager.report_redis_error(ValueError("WRONGTYPE"))
+    assert redis_connection_manager._request_redis_down_until == 0.0
+
+    redis_connection_manager.report_redis_error(TimeoutError("read timed out"))
+    assert redis_connection_manager._request_redis_down_until > 0
@@ -0,0 +1,42 @@
+"""
+Unit tests for users list keyset pagination cursors
+"""
+import base64
+import pytest
+from datetime import datetime
+from fastapi import HTTPException
+
+from src.api.simple_user_management import _decode_cursor, _encode_cursor, list_all_users
+
+def test_cursor_round_trip():
+    """Test a cursor decodes back to the keyset bind parameters"""
+    created_at = datetime(2025, 1, 15, 10, 30, 0, 123456)
+
+    cursor = _encode_cursor(created_at, 42)
+
+    assert _decode_cursor(cursor) == {"after_created": created_at, "after_id": 42}
+    assert "|" not in cursor
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode()
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    _b64("2025-01-15T10:30:00"),
+    _b64("2025-01-15T10:30:00|42|7"),
+    _b64("yesterday|42"),
+    _b64("2025-01-15T10:30:00|abc"),
+    base64.urlsafe_b64encode(b"\xff\xfe|1").decode()
+])
+def test_malformed_cursor_is_value_error(cursor):
+    """Test every kind of malformed cursor fails decoding with ValueError"""
+    with pytest.raises(ValueError):
+        _decode_cursor(cursor)
+
+@pytest.mark.asyncio
+async def test_malformed_cursor_returns_400():
+    """Test the list endpoint rejects a malformed cursor before touching the cache or database"""
+    with pytest.raises(HTTPException) as exc_info:
+        await list_all_users(limit=10, after="not-a-cursor")
+
+    assert exc_info.value.status_code == 400
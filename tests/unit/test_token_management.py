@@ -0,0 +1,90 @@
+"""
+Unit tests for daily token storage and status classification
+"""
+import pytest
+from datetime import datetime
+
+from src.api import token_management_api
+from src.api.token_management_api import _TokenStore, _status_for, _token_status, _EXPIRING_WINDOW
+
+NOW_TS = 1_700_000_000.0
+
+@pytest.fixture
+def store() -> _TokenStore:
+    """Create an empty token store"""
+    return _TokenStore()
+
+def upsert(store: _TokenStore, user_id: str = "user_001", **overrides):
+    """Upsert a token row with sensible defaults"""
+    row = {
+        "user_id": user_id,
+        "username": "demo_user",
+        "token": "sk_token_demo_123",
+        "token_type": "sharekhan_daily",
+        "expires_at": "2025-01-02T00:00:00",
+        "status": "active",
+        "last_used": "2025-01-01T00:00:00"
+    }
+    row.update(overrides)
+    store.upsert(**row)
+
+def test_upsert_normalizes_missing_fields(store):
+    """Test blank username and token type get their defaults"""
+    upsert(store, username="", token_type="")
+
+    row = store.get("user_001")
+    assert row["username"] == "Unknown"
+    assert row["token_type"] == "sharekhan_daily"
+    assert row["_expires_ts"] == datetime.fromisoformat("2025-01-02T00:00:00").timestamp()
+    assert store.token_previews[store.index_of("user_001")] == "sk_token..."
+
+def test_upsert_overwrites_in_place(store):
+    """Test a second upsert for a user replaces its row without adding one"""
+    upsert(store)
+    upsert(store, "user_002")
+    version = store.version
+
+    upsert(store, token="sk_token_new_999", expires_at="2025-01-03T00:00:00", auth_url="https://auth")
+
+    assert len(store) == 2
+    assert store.index_of("user_001") == 0
+    assert store.version == version + 1
+    row = store.get("user_001")
+    assert row["token"] == "sk_token_new_999"
+    assert row["expires_at"] == "2025-01-03T00:00:00"
+    assert row["auth_url"] == "https://auth"
+    assert store.get("user_002")["token"] == "sk_token_demo_123"
+
+def test_get_unknown_user(store):
+    """Test lookups for a missing user return None"""
+    assert store.get("missing") is None
+    assert store.index_of("missing") is None
+
+def test_status_classification():
+    """Test expired, expiring and active tokens and their next transition"""
+    assert _status_for(NOW_TS - 1, NOW_TS) == ("expired", float("inf"))
+
+    expiring_ts = NOW_TS + _EXPIRING_WINDOW - 1
+    assert _status_for(expiring_ts, NOW_TS) == ("expiring", expiring_ts)
+
+    active_ts = NOW_TS + _EXPIRING_WINDOW + 60
+    assert _status_for(active_ts, NOW_TS) == ("active", NOW_TS + 60)
+
+def test_token_status_recomputed_at_transition(monkeypatch):
+    """Test the cached status is reused until its transition time, then refreshed"""
+    monkeypatch.setattr(token_management_api, "_STATUS_CACHE", {})
+    expires_ts = NOW_TS + _EXPIRING_WINDOW + 60
+
+    assert _token_status("user_001", expires_ts, NOW_TS) == "active"
+    assert _token_status("user_001", expires_ts, NOW_TS + 59) == "active"
+    assert _token_status("user_001", expires_ts, NOW_TS + 61) == "expiring"
+    assert _token_status("user_001", expires_ts, expires_ts + 1) == "expired"
+
+def test_default_expiry_is_jittered_around_ttl():
+    """Test default expiries stay within the jitter band around the base TTL"""
+    now = datetime(2025, 1, 1)
+    base = token_management_api._DEFAULT_TOKEN_TTL
+    jitter = base * token_management_api._TTL_JITTER
+
+    for _ in range(100):
+        assert now + base - jitter <= token_management_api._default_expiry(now) <= now + base + jitter
@@ -0,0 +1,151 @@
+"""
+Unit tests for the column-wise broker user table and broker user routes
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.trading_control import StatusASGI, UserTable, router
+
+@pytest.fixture
+def client() -> TestClient:
+    """Create a test client for the trading control routes"""
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+@pytest.fixture
+def fast_client() -> TestClient:
+    """Create a test client for the status fast path mounted as the apps mount it"""
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.mount("/api/v1/control/fast", StatusASGI())
+    return TestClient(app)
+
+@pytest.fixture
+def table() -> UserTable:
+    """Create a table holding two broker users"""
+    users = UserTable()
+    users["user_a"] = {
+        "user_id": "user_a",
+        "name": "Alice",
+        "initial_capital": 100000,
+        "total_trades": "3",
+        "paper_trading": 1,
+        "is_active": True,
+        "api_key": "key_a",
+        "is_master": True
+    }
+    users["user_b"] = {"user_id": "user_b", "name": "Bob", "paper_trading": False}
+    return users
+
+def test_row_view_reads_typed_columns(table):
+    """Test rows coerce column types and expose extra fields"""
+    row = table["user_a"]
+
+    assert row["initial_capital"] == 100000.0
+    assert isinstance(row["initial_capital"], float)
+    assert row["total_trades"] == 3
+    assert row["paper_trading"] is True
+    assert row["api_key"] == "key_a"
+    assert table.master_user_id == "user_a"
+    assert dict(table["user_b"])["paper_trading"] is False
+
+def test_row_view_is_live(table):
+    """Test writes through a row view land in the table and bump the version"""
+    row = table["user_b"]
+    version = table.version
+
+    row["current_capital"] = 5000
+    row["broker"] = "sharekhan"
+
+    assert table["user_b"]["current_capital"] == 5000.0
+    assert table.current_capital[table.idx["user_b"]] == 5000.0
+    assert table["user_b"]["broker"] == "sharekhan"
+    assert table.version == version + 2
+
+def test_row_view_guards_required_columns(table):
+    """Test required columns cannot be deleted and user_id cannot be renamed"""
+    row = table["user_a"]
+
+    with pytest.raises(KeyError):
+        del row["name"]
+    with pytest.raises(ValueError):
+        row["user_id"] = "user_z"
+
+    del row["api_key"]
+    assert "api_key" not in row
+
+def test_replace_resets_extras_and_master(table):
+    """Test assigning a whole record drops the old extra fields"""
+    table["user_a"] = {"user_id": "user_a", "name": "Alice"}
+
+    assert "api_key" not in table["user_a"]
+    assert table.master_user_id is None
+    assert len(table) == 2
+
+def test_delete_reindexes_rows(table):
+    """Test removing a user shifts later rows and clears the master"""
+    table["user_c"] = {"user_id": "user_c", "name": "Carol"}
+
+    record = table.pop("user_a")
+
+    assert record["name"] == "Alice"
+    assert "user_a" not in table
+    assert table.master_user_id is None
+    assert table.idx == {"user_b": 0, "user_c": 1}
+    assert table["user_c"]["name"] == "Carol"
+    assert table.pop("user_a", None) is None
+    with pytest.raises(KeyError):
+        table.pop("user_a")
+    assert table.get("user_a") is None
+
+def test_iteration_uses_snapshot(table):
+    """Test users added or removed mid-iteration do not break the loop"""
+    seen = []
+    for user_id in table:
+        seen.append(user_id)
+        table[f"{user_id}_new"] = {"user_id": f"{user_id}_new", "name": "New"}
+    assert seen == ["user_a", "user_b"]
+
+    names = []
+    for user_id, row in table.items():
+        if user_id == "user_a":
+            del table["user_b"]
+        names.append(row["name"])
+    assert names == ["Alice", "New", "New"]
+    assert [row["name"] for row in table.values()] == ["Alice", "New", "New"]
+
+def test_update_broker_user_malformed_body(client):
+    """Test a body that is not JSON is rejected with 422, not 500"""
+    response = client.put("/users/broker/user_a", content=b"notjson")
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "json_invalid"
+
+def test_update_broker_user_wrong_field_type(client):
+    """Test valid JSON with a mistyped field is rejected with 422"""
+    response = client.put("/users/broker/user_a", json={"initial_capital": "lots"})
+
+    assert response.status_code == 422
+    assert "input" not in response.json()["detail"][0]
+
+def test_fast_status_matches_router(fast_client):
+    """Test the mounted ASGI fast path serves the same status as the router"""
+    response = fast_client.get("/api/v1/control/fast/trading/status")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == fast_client.get("/api/trading/status").json()
+
+def test_fast_manual_status_reads_user_id(fast_client):
+    """Test the manual-auth fast path echoes the user_id query parameter"""
+    response = fast_client.get("/api/v1/control/fast/sharekhan-manual/status", params={"user_id": "user_a"})
+
+    assert response.status_code == 200
+    assert response.json()["user_id"] == "user_a"
+
+def test_fast_path_rejects_unknown_requests(fast_client):
+    """Test the fast path answers other methods with 405 and other paths with 404"""
+    assert fast_client.post("/api/v1/control/fast/trading/status").status_code == 405
+    assert fast_client.get("/api/v1/control/fast/unknown").status_code == 404
@@ -0,0 +1,82 @@
+"""
+Unit tests for the ShareKhan market data routes
+"""
+import importlib
+import sys
+import time
+import types
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+@pytest.fixture
+def sharekhan(monkeypatch):
+    """In-process stand-in for the data.sharekhan_client feed module"""
+    feed = types.ModuleType("data.sharekhan_client")
+    feed.sharekhan_client = types.SimpleNamespace(connected=True, td_obj=None)
+    feed.live_market_data = {"NIFTY": {"ltp": 19000.0}, "BANKNIFTY": {"ltp": 44000.0}}
+    feed.get_live_data_for_symbol = feed.live_market_data.get
+    feed.get_sharekhan_status = lambda: {"connected": True}
+    package = types.ModuleType("data")
+    package.sharekhan_client = feed
+    monkeypatch.setitem(sys.modules, "data", package)
+    monkeypatch.setitem(sys.modules, "data.sharekhan_client", feed)
+    return feed
+
+@pytest.fixture
+def integration(sharekhan):
+    """The integration module imported against the stand-in feed"""
+    sys.modules.pop("src.api.truedata_integration", None)
+    module = importlib.import_module("src.api.truedata_integration")
+    yield module
+    sys.modules.pop("src.api.truedata_integration", None)
+
+@pytest.fixture
+def client(integration) -> TestClient:
+    """Create a test client for the ShareKhan routes"""
+    app = FastAPI()
+    app.include_router(integration.router)
+    return TestClient(app)
+
+@pytest.mark.parametrize("path", ["/sharekhan/subscribe", "/sharekhan/unsubscribe"])
+def test_symbols_malformed_body(client, path):
+    """Test a body that is not JSON is rejected with 422, not 500"""
+    response = client.post(path, content=b"notjson")
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "json_invalid"
+
+@pytest.mark.parametrize("path", ["/sharekhan/subscribe", "/sharekhan/unsubscribe"])
+def test_symbols_wrong_type(client, path):
+    """Test a JSON body that is not a list of symbols is rejected with 422"""
+    response = client.post(path, json={"symbols": "NIFTY"})
+
+    assert response.status_code == 422
+
+def test_unsubscribe_removes_only_known_symbols(client, sharekhan):
+    """Test unsubscribe drops listed symbols present in live data"""
+    response = client.post("/sharekhan/unsubscribe", json=["NIFTY", "UNKNOWN"])
+
+    assert response.status_code == 200
+    assert response.json()["symbols"] == ["NIFTY", "UNKNOWN"]
+    assert list(sharekhan.live_market_data) == ["BANKNIFTY"]
+
+def test_data_snapshot_refreshed_by_notify_tick(client, integration, sharekhan):
+    """Test a notified tick is served at once instead of the cached snapshot"""
+    assert client.get("/sharekhan/data").json()["data"]["market_data"]["NIFTY"]["ltp"] == 19000.0
+
+    sharekhan.live_market_data["NIFTY"] = {"ltp": 19010.0}
+    integration.notify_tick("NIFTY")
+
+    assert client.get("/sharekhan/data").json()["data"]["market_data"]["NIFTY"]["ltp"] == 19010.0
+
+def test_data_snapshot_expires_without_notify(client, integration, sharekhan, monkeypatch):
+    """Test an un-notified write is served once the TTL lapses, even after earlier notifications"""
+    monkeypatch.setattr(integration, "_SNAPSHOT_TTL", 0.05)
+    integration.notify_tick("NIFTY")
+    client.get("/sharekhan/data")
+
+    sharekhan.live_market_data["NIFTY"] = {"ltp": 19020.0}
+    time.sleep(0.06)
+
+    assert client.get("/sharekhan/data").json()["data"]["market_data"]["NIFTY"]["ltp"] == 19020.0
@@ -0,0 +1,140 @@
+"""
+Unit tests for the Redis-backed users store in the v1 users API
+"""
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from src.api import users_api_v1
+from src.core import redis_connection_manager
+
+@pytest.fixture
+def redis_client():
+    """Fresh fake Redis wired in as the users store, with module state reset"""
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async def get_client():
+        return client
+
+    with patch.object(redis_connection_manager, "get_redis_client", get_client), \
+            patch.object(redis_connection_manager, "_request_redis_down_until", 0.0), \
+            patch.object(users_api_v1, "_redis_seeded", False):
+        users_api_v1._users_list_cache.clear()
+        yield client
+
+@pytest.fixture
+def redis_down():
+    """Users store whose Redis connection always fails"""
+    async def get_client():
+        raise ConnectionError("connection refused")
+
+    with patch.object(redis_connection_manager, "get_redis_client", get_client), \
+            patch.object(redis_connection_manager, "_request_redis_down_until", 0.0), \
+            patch.object(users_api_v1, "_redis_seeded", False):
+        yield
+
+def make_user(user_id="user_new", email="new@trade123.com"):
+    """Create a user record as create_user builds it"""
+    return {
+        "id": user_id,
+        "name": "New User",
+        "email": email,
+        "role": "trader",
+        "trading_limit": 50000.0,
+        "is_active": True,
+        "created_at": "2025-02-01T00:00:00",
+        "last_login": None,
+        "total_trades": 0,
+        "total_pnl": 0.0
+    }
+
+@pytest.mark.asyncio
+async def test_seed_on_first_use(redis_client):
+    """Test Redis is seeded from MOCK_USERS_DB once, in insertion order"""
+    total, users = await users_api_v1._store_list(None, 0, 10)
+
+    assert total == len(users_api_v1.MOCK_USERS_DB)
+    assert [user["id"] for user in users] == list(users_api_v1.MOCK_USERS_DB)
+    assert await redis_client.get("users_v1:seeded") == "1"
+
+    # A second worker must not seed again
+    with patch.object(users_api_v1, "_redis_seeded", False):
+        await users_api_v1._store_list(None, 0, 10)
+    assert await redis_client.zcard("users_v1:index") == len(users_api_v1.MOCK_USERS_DB)
+
+@pytest.mark.asyncio
+async def test_create_and_duplicate_email(redis_client):
+    """Test create stores the user and rejects a taken email"""
+    assert await users_api_v1._store_create(make_user()) is True
+    assert await users_api_v1._store_get("user_new") == make_user()
+
+    total, users = await users_api_v1._store_list(None, 0, 10)
+    assert users[-1]["id"] == "user_new"
+
+    assert await users_api_v1._store_create(make_user("user_dup")) is False
+    assert await users_api_v1._store_get("user_dup") is None
+    assert await users_api_v1._store_list(None, 0, 10) == (total, users)
+
+@pytest.mark.asyncio
+async def test_update(redis_client):
+    """Test update merges fields and ignores unknown users"""
+    updated = await users_api_v1._store_update("user_001", {"name": "Renamed", "is_active": False})
+
+    assert updated["name"] == "Renamed"
+    assert updated["email"] == "demo@trade123.com"
+    assert (await users_api_v1._store_get("user_001"))["is_active"] is False
+
+    assert await users_api_v1._store_update("missing", {"name": "Ghost"}) is None
+    assert not await redis_client.exists("users_v1:user:missing")
+
+@pytest.mark.asyncio
+async def test_delete_frees_email(redis_client):
+    """Test delete removes the user, its index entry and its email claim"""
+    await users_api_v1._store_create(make_user())
+
+    deleted = await users_api_v1._store_delete("user_new")
+
+    assert deleted["id"] == "user_new"
+    assert await users_api_v1._store_get("user_new") is None
+    assert await users_api_v1._store_delete("user_new") is None
+    assert await redis_client.zscore("users_v1:index", "user_new") is None
+    assert await users_api_v1._store_create(make_user("user_again")) is True
+
+@pytest.mark.asyncio
+async def test_writes_change_version(redis_client):
+    """Test every write bumps the version that keys the listing cache"""
+    before = await users_api_v1._store_version()
+    await users_api_v1._store_create(make_user())
+    after_create = await users_api_v1._store_version()
+    await users_api_v1._store_delete("user_new")
+
+    assert len({before, after_create, await users_api_v1._store_version()}) == 3
+
+@pytest.mark.asyncio
+async def test_active_filter(redis_client):
+    """Test the is_active filter is applied before pagination"""
+    total, users = await users_api_v1._store_list(False, 0, 10)
+
+    assert total == 1
+    assert [user["id"] for user in users] == ["user_002"]
+
+@pytest.mark.asyncio
+async def test_redis_down_reads_fall_back(redis_down):
+    """Test reads are served from MOCK_USERS_DB while Redis is down"""
+    assert await users_api_v1._store_get("user_001") == users_api_v1.MOCK_USERS_DB["user_001"]
+    assert redis_connection_manager._request_redis_down_until > 0
+
+@pytest.mark.asyncio
+async def test_redis_down_writes_fail(redis_down):
+    """Test writes return 503 instead of landing in process memory"""
+    with pytest.raises(HTTPException) as exc_info:
+        await users_api_v1._store_create(make_user())
+    assert exc_info.value.status_code == 503
+    assert "user_new" not in users_api_v1.MOCK_USERS_DB
+
+    for write in (users_api_v1._store_update("user_001", {"name": "X"}), users_api_v1._store_delete("user_001")):
+        with pytest.raises(HTTPException) as exc_info:
+            await write
+        assert exc_info.value.status_code == 503